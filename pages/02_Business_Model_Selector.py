@@ -1,33 +1,13 @@
 import streamlit as st
-import json
+
+from utils.bm_archetype import SECONDARY_QUESTIONS, ranking_table
+from utils.data_loader import load_business_models, load_json
 
 # -------------------------------
 # Load Data
 # -------------------------------
-with open("data/business_models.json", "r") as f:
-    BUSINESS_MODELS = json.load(f)
-
-with open("data/archetype_tags.json", "r") as f:
-    ARCHETYPE_TAGS = json.load(f)
-
-
-MATURITY_MAP = {
-    "emerging": 0.3,
-    "established": 0.6,
-    "dominant": 1.0
-}
-
-
-# -------------------------------
-# Scoring Function
-# -------------------------------
-def score_model(model, archetype_tags):
-    tag_overlap = len(set(model["tags"]) & set(archetype_tags)) / len(model["tags"])
-    maturity_w = MATURITY_MAP[model["maturity_level"]]
-    success = model["success_score"]
-
-    final_score = (0.5 * tag_overlap) + (0.3 * success) + (0.2 * maturity_w)
-    return final_score
+BUSINESS_MODELS = load_business_models()
+ARCHETYPE_TAGS = load_json("data/archetype_tags.json")
 
 
 # -------------------------------
@@ -68,26 +48,14 @@ else:
     if not st.session_state["secondary_done"]:
         st.subheader("2. Refine your profile")
 
-        q1 = st.selectbox(
-            "How fast do you want to commercialize?",
-            ["Slow & Research-heavy", "Moderate", "Fast"]
-        )
-
-        q2 = st.selectbox(
-            "Which is more important to you?",
-            ["Recurring revenue", "Impact outcomes", "User scale", "Technology depth"]
-        )
-
-        q3 = st.selectbox(
-            "What is your available startup capital?",
-            ["Very low (< R50k)", "Medium", "High"]
-        )
+        answers = {
+            key: st.selectbox(text, list(options))
+            for key, text, options in SECONDARY_QUESTIONS
+        }
 
         if st.button("Generate Recommendations"):
             st.session_state["secondary_done"] = True
-            st.session_state["q1"] = q1
-            st.session_state["q2"] = q2
-            st.session_state["q3"] = q3
+            st.session_state.update(answers)
             st.rerun()
 
     # -------------------------------
@@ -97,14 +65,9 @@ else:
 if st.session_state["secondary_done"]:
     st.subheader("3. Recommended Business Models")
 
-    # ---- Score models ----
-    results = []
-    for model in BUSINESS_MODELS:
-        score = score_model(model, archetype_tags)
-        results.append((model, score))
-
-    results = sorted(results, key=lambda x: x[1], reverse=True)
-    top5 = results[:5]
+    # ---- Precomputed ranking for (archetype, q1, q2, q3) ----
+    answers = [st.session_state[key] for key, _, _ in SECONDARY_QUESTIONS]
+    top5 = ranking_table().ranked(archetype, *answers, k=5)
 
     # -------------------------------
     # Display Top 5 WITH full explanation
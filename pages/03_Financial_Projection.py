@@ -5,6 +5,8 @@ import io
 from datetime import datetime
 import streamlit as st
 
+from utils import finance, monte_carlo
+
 # -------- Header --------
 st.title("Financial Projections")
 
@@ -34,7 +36,23 @@ rev_down = st.sidebar.slider("Pessimistic: Revenue -%", 0.0, 0.5, 0.20, step=0.0
 cost_up = st.sidebar.slider("Pessimistic: Costs +%", 0.0, 0.5, 0.10, step=0.01)
 
 st.sidebar.markdown("---")
-n_sims = st.sidebar.slider("Monte Carlo Samples per scenario", 100, 5000, 1000, step=100)
+mc_mode = st.sidebar.radio("Monte Carlo precision", ["Fixed sample count", "Target precision"])
+if mc_mode == "Fixed sample count":
+    n_sims = st.sidebar.slider("Monte Carlo Samples per scenario", 100, 5000, 1000, step=100)
+else:
+    mc_tolerance = st.sidebar.slider("Success Prob. tolerance (± pts, 95%)", 0.25, 5.0, 1.0, step=0.25)
+    mc_budget = st.sidebar.slider("Time budget per scenario (s)", 0.1, 5.0, 1.0, step=0.1,
+                                  help="Bounds each scenario's run, distributions included, and the "
+                                       "Summary's scenario comparison.")
+    n_sims = None
+mc_seed = st.sidebar.number_input("Simulation seed", 0, 2**31 - 1, 42, step=1)
+SAMPLING_LABELS = {
+    "mc": "Plain Monte Carlo",
+    "antithetic": "Antithetic variates",
+    "halton": "Quasi-random (scrambled Halton)",
+}
+sampling = st.sidebar.selectbox("Sampling", list(SAMPLING_LABELS), format_func=SAMPLING_LABELS.get,
+                                help="All scenarios share the same random numbers, so their differences are less noisy.")
 
 # ------------------------
 # Helper functions
@@ -72,18 +90,8 @@ def npv(rate, flows):
     return np.sum([cf / (1 + rate)**t for t, cf in enumerate(flows, start=1)])
 
 def irr(flows):
-    lo, hi = -0.99, 5.0
-    for _ in range(200):
-        mid = (lo + hi) / 2
-        npv_mid = sum(cf / (1 + mid)**t for t, cf in enumerate(flows, start=0))
-        npv_lo = sum(cf / (1 + lo)**t for t, cf in enumerate(flows, start=0))
-        if npv_mid == 0 or abs(npv_mid) < 1e-6:
-            return mid
-        if npv_lo * npv_mid < 0:
-            hi = mid
-        else:
-            lo = mid
-    return 0.0
+    rates, flags = finance.irr_batch([flows])
+    return 0.0 if flags[0] == finance.IRR_NONE else float(rates[0])
 
 def payback(flows):
     cum = np.cumsum(flows)
@@ -94,20 +102,28 @@ def payback(flows):
             return i - 1 + (abs(prev) / delta)
     return None
 
-def success_prob(df, discount, n):
-    base_flows = df["Net Cashflow (R)"].to_numpy()
-    rev = df["Revenue (R)"].to_numpy()
-    cost = (df["COGS (R)"] + df["OPEX (R)"] + df["CAPEX (R)"]).to_numpy()
-    rng = np.random.default_rng()
-    success = 0
-    for _ in range(n):
-        rev_mult = rng.uniform(0.8, 1.2)
-        cost_mult = rng.uniform(0.85, 1.15)
-        rate_mult = rng.uniform(0.9, 1.1)
-        sim_flows = (rev * rev_mult - cost * cost_mult)
-        if npv(discount * rate_mult, sim_flows) > 0:
-            success += 1
-    return success / n * 100
+# Paths that also get IRR / payback / PI for the distributions (the first ones of each run)
+DISTRIBUTION_SAMPLES = 100_000
+
+def estimate(df, discount, n, seed=None):
+    """Success probability and full distributions from one simulation run."""
+    rev, cost = monte_carlo.scenario_inputs(df)
+    capex = monte_carlo.capex_input(df)
+    if n is None:
+        return monte_carlo.estimate_adaptive(rev, cost, discount, mc_tolerance, time_budget=mc_budget,
+                                             seed=seed, method=sampling, capex=capex,
+                                             distribution_samples=DISTRIBUTION_SAMPLES)
+    return monte_carlo.estimate(rev, cost, discount, n, seed, sampling, capex=capex,
+                                distribution_samples=DISTRIBUTION_SAMPLES)
+
+def distribution_table(dists):
+    rows = []
+    for name, label, scale in [("npv", "NPV (R)", 1), ("irr", "IRR (%)", 100),
+                               ("payback", "Payback (yrs)", 1), ("pi", "PI", 1)]:
+        s = dists[name].summary()
+        rows.append([label] + [s[k] * scale for k in ("p5", "p50", "p95", "mean", "expected_shortfall")]
+                    + [s["missing"]])
+    return pd.DataFrame(rows, columns=["Metric", "P5", "P50", "P95", "Mean", "Expected shortfall (5%)", "No value"])
 
 def metrics(df, discount):
     flows = df["Net Cashflow (R)"].tolist()
@@ -148,6 +164,7 @@ for key, df_default in [
         st.session_state[key] = df_default.copy()
 
 tabs = st.tabs(["Baseline", "Optimistic", "Pessimistic", "Summary"])
+samples_used = {}
 
 # ------------------------
 # Scenario tab component
@@ -187,18 +204,38 @@ def scenario_tab(label, key, default_df):
     st.session_state[key] = edited.copy()
 
     mets = metrics(edited, discount)
-    prob = success_prob(edited, discount, n_sims)
+    est = estimate(edited, discount, n_sims, mc_seed)
+    dists = est["distributions"]
+    prob = est["success_prob"]
+    samples_used[key] = est["samples"]
 
     c1, c2, c3, c4, c5 = st.columns(5)
     c1.metric("NPV (R)", f"{mets['NPV']:,.0f}")
-    c2.metric("IRR (%)", f"{mets['IRR']*100:.1f}")
+    c2.metric("IRR (%)", f"{mets['IRR']*100:.1f}" if not np.isnan(mets['IRR']) else "—")
     c3.metric("Payback (yrs)", f"{mets['Payback']:.1f}" if mets['Payback'] else "—")
     c4.metric("PI", f"{mets['PI']:.2f}")
-    c5.metric("Success Prob. (%)", f"{prob:.1f}")
+    c5.metric("Success Prob. (%)", f"{prob:.1f}", help=f"± {est['success_se']:.2f} (one standard error)")
+    if "interval" in est:
+        lo, hi = est["interval"]
+        reason = {"tolerance": "tolerance reached", "time": "time budget used up",
+                  "max_samples": "sample cap reached"}[est["stopped"]]
+        st.caption(f"Target precision: {est['samples']:,} samples, 95% interval {lo:.1f}–{hi:.1f}% ({reason}).")
+
+    with st.expander("📈 Monte Carlo distributions"):
+        st.dataframe(distribution_table(dists).style.format({
+            "P5": "{:,.2f}", "P50": "{:,.2f}", "P95": "{:,.2f}",
+            "Mean": "{:,.2f}", "Expected shortfall (5%)": "{:,.2f}"
+        }), hide_index=True, use_container_width=True)
+        edges, counts = dists["npv"].sketch.histogram(bins=30)
+        st.caption("NPV distribution (R)")
+        st.bar_chart(pd.DataFrame({"Samples": counts}, index=[f"{e:,.0f}" for e in edges[:-1]]))
+        st.caption("IRR and payback have no value for paths that never break even.")
 
     with st.expander("Mentor Tips"):
         tips = []
-        if mets["IRR"] < 0.08:
+        if np.isnan(mets["IRR"]):
+            tips.append("No IRR — the cashflows never break even.")
+        elif mets["IRR"] < 0.08:
             tips.append("IRR below 8% — tough sell to investors.")
         elif mets["IRR"] < 0.15:
             tips.append("IRR 8–15% — fair; suitable for grants/blended funds.")
@@ -210,7 +247,8 @@ def scenario_tab(label, key, default_df):
             tips.append("Payback 5–10 years — typical for infra projects.")
         else:
             tips.append("Payback <5 years — highly investable.")
-        tips.append(f"Success Probability {prob:.0f}% (based on {n_sims} simulations).")
+        tips.append(f"Success Probability {prob:.0f}% ± {est['success_se']:.1f} "
+                    f"(based on {est['samples']} simulations, {SAMPLING_LABELS[sampling].lower()}).")
         for t in tips:
             st.markdown("- " + t)
 
@@ -241,6 +279,22 @@ with tabs[3]:
         "Success Prob. (%)": "{:.1f}"
     }), hide_index=True, use_container_width=True)
 
+    # Scenario differences on common random numbers
+    crn = monte_carlo.estimate_scenarios(
+        {name: monte_carlo.scenario_inputs(df) for name, df in
+         [("Baseline", df_base), ("Optimistic", df_opt), ("Pessimistic", df_pes)]},
+        discount, n_sims or max(samples_used.values()), mc_seed, sampling,
+        time_budget=None if n_sims else mc_budget,
+    )
+    st.caption(f"Change vs Baseline (same {crn['Baseline']['samples']:,} simulated paths for every scenario)")
+    st.dataframe(pd.DataFrame([
+        [name, d["success_prob"], d["success_se"], d["npv_mean"], d["npv_se"]]
+        for name, d in crn["differences"].items()
+    ], columns=["Scenario", "Δ Success Prob. (pts)", "± SE", "Δ Mean NPV (R)", "± SE (R)"]).style.format({
+        "Δ Success Prob. (pts)": "{:+.1f}", "± SE": "{:.2f}",
+        "Δ Mean NPV (R)": "{:+,.0f}", "± SE (R)": "{:,.0f}"
+    }), hide_index=True, use_container_width=True)
+
     # --- PDF export ---
     from reportlab.lib.pagesizes import A4
     from reportlab.pdfgen import canvas
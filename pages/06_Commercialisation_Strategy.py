@@ -5,10 +5,11 @@
 # ============================================
 
 import streamlit as st
-import json
 from pathlib import Path
 from collections import defaultdict
 
+from utils.data_loader import load_json
+
 # ----------------------------
 # PAGE CONFIG
 # ----------------------------
@@ -32,8 +33,7 @@ if not data_path.exists():
     st.error("❌ Missing file: `commercialisation_questionnaire.json` in `/data` folder.")
     st.stop()
 
-with open(data_path, "r", encoding="utf-8") as f:
-    questions = json.load(f)["questions"]
+questions = load_json(str(data_path))["questions"]
 
 # ----------------------------
 # INITIALISE SCORING BUCKETS
@@ -100,8 +100,7 @@ if st.button("🔍 Generate My Strategy Mix", use_container_width=True):
     rationale_data = {}
 
     if rationale_path.exists():
-        with open(rationale_path, "r", encoding="utf-8") as f:
-            rationale_data = json.load(f)
+        rationale_data = load_json(str(rationale_path))
 
     # --- Commercialisation Pathway Breakdown ---
     if top_pathway in rationale_data:
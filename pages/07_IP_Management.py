@@ -5,9 +5,10 @@
 # ============================================================
 
 import streamlit as st
-import json
 from pathlib import Path
 
+from utils.data_loader import load_json
+
 # ----------------------------
 # PAGE CONFIG
 # ----------------------------
@@ -32,8 +33,7 @@ if not q_path.exists():
     st.stop()
 
 try:
-    with open(q_path, "r", encoding="utf-8") as f:
-        questions = json.load(f)["questions"]
+    questions = load_json(str(q_path))["questions"]
 except Exception as e:
     st.error(f"❌ Error loading ip_questionnaire.json: {e}")
     st.stop()
@@ -47,8 +47,7 @@ if not r_path.exists():
     st.stop()
 
 try:
-    with open(r_path, "r", encoding="utf-8") as f:
-        rationale_data = json.load(f)
+    rationale_data = load_json(str(r_path))
 except Exception as e:
     st.error(f"❌ Error loading ip_rationale.json: {e}")
     st.stop()
@@ -4,12 +4,13 @@
 # FUNCTION: Hybrid Dynamic Risk Dashboard
 # ============================================
 
-import json
 from pathlib import Path
 from collections import defaultdict
 import pandas as pd
 import streamlit as st
 
+from utils.data_loader import load_json as load_asset
+
 # ----------------------------------------------------
 # PAGE CONFIG
 # ----------------------------------------------------
@@ -33,8 +34,7 @@ def load_json(path: str):
     if not p.exists():
         st.error(f"❌ Missing file: `{path}`")
         st.stop()
-    with p.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    return load_asset(path)
 
 engine = load_json("data/risk_engine.json")
 library = load_json("data/risk_library.json")
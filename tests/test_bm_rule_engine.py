@@ -0,0 +1,13 @@
+from utils.bm_rule_engine import check_incremental_parity, load_compiled_rules
+
+
+def test_incremental_scorer_matches_full_recompute():
+    deviation, ranks_match = check_incremental_parity(load_compiled_rules())
+    assert deviation < 1e-12
+    assert ranks_match
+
+
+def test_incremental_scorer_parity_other_seed():
+    deviation, ranks_match = check_incremental_parity(load_compiled_rules(), steps=300, seed=7)
+    assert deviation < 1e-12
+    assert ranks_match
@@ -0,0 +1,126 @@
+import random
+from collections import Counter
+
+import pytest
+
+from utils.model_logic import (
+    TRL_GATE_PENALISED, apply_trl_caps, compiled_questions, load_models, rank_for_trl, rank_models,
+    score_models, tag_index, tag_overlap, trl_gate_score_adjustments,
+)
+from utils.tag_registry import UNKNOWN_TAG, load_registry, tag_id, tag_ids
+from utils.model_logic_bench import (
+    accumulate_tags_per_call, apply_trl_caps_original, random_profile, rank_for_trl_per_call,
+    score_models_full_scan, synthetic_catalogue, synthetic_question_bank,
+    trl_gate_score_adjustments_original,
+)
+
+
+@pytest.fixture(scope="module", params=[70, 1000])
+def catalogue(request):
+    models = synthetic_catalogue(request.param)
+    vocab = sorted({t for m in models for t in m["tags"]}) + TRL_GATE_PENALISED
+    return models, vocab, tag_index(models)
+
+
+def test_score_models_matches_full_scan(catalogue):
+    models, vocab, index = catalogue
+    rng = random.Random(1)
+    for _ in range(30):
+        profile = random_profile(vocab, rng)
+        assert score_models(profile, index, 3) == score_models_full_scan(profile, models, 3)
+
+
+@pytest.mark.parametrize("trl", [0, 1, 3, 4, 4.5, 5, 5.0, 6, 7, 9, 12])
+def test_rank_for_trl_matches_per_call_pipeline(catalogue, trl):
+    models, vocab, index = catalogue
+    rng = random.Random(2)
+    for _ in range(10):
+        profile = random_profile(vocab, rng)
+        got = rank_for_trl(profile, trl, index, 5)
+        want = rank_for_trl_per_call(profile, trl, models, 5)
+        assert [(r["model"]["id"], r["score"]) for r in got] == [(r["model"]["id"], r["score"]) for r in want]
+
+
+def test_rank_models_matches_counter_chain(catalogue):
+    models, vocab, index = catalogue
+    rng = random.Random(3)
+    bank = synthetic_question_bank(vocab)
+    for _ in range(20):
+        selections = {q["id"]: rng.choice(list(q["options"])) for q in rng.sample(bank, 10)}
+        trl = rng.randint(0, 9)
+        tally = accumulate_tags_per_call(selections, bank)
+        assert compiled_questions(bank).tally(selections) == tally
+
+        rows, scores = rank_models(selections, trl, index, 3, bank=bank)
+        want = rank_for_trl_per_call(tally, trl, models, 3)
+        assert [(models[r]["id"], s) for r, s in zip(rows, scores.tolist())] == \
+            [(w["model"]["id"], w["score"]) for w in want]
+
+
+def float_profile(vocab, rng):
+    """Weights such as 0.1 + 0.2 that round differently when summed in another order."""
+    tags = rng.sample(vocab, 8)
+    return Counter({t: rng.choice([-0.7, -0.3, 0.1, 0.2, 0.3, 0.6, 1.1]) for t in tags})
+
+
+@pytest.mark.parametrize("trl", [None, 0, 3, 4, 5, 6, 8])
+def test_float_weights_match_original_bit_for_bit(catalogue, trl):
+    models, vocab, index = catalogue
+    rng = random.Random(5)
+    for _ in range(30):
+        profile = float_profile(vocab, rng)
+        if trl is None:
+            got, want = score_models(profile, index, 5), score_models_full_scan(profile, models, 5)
+        else:
+            got, want = rank_for_trl(profile, trl, index, 5), rank_for_trl_per_call(profile, trl, models, 5)
+        assert [(r["model"]["id"], r["score"]) for r in got] == [(r["model"]["id"], r["score"]) for r in want]
+
+
+@pytest.mark.parametrize("trl", [None, 0, 3, 4, 4.5, 5, 6, 7, 9, 12])
+def test_trl_gate_score_adjustments_matches_original(catalogue, trl):
+    _, vocab, _ = catalogue
+    rng = random.Random(6)
+    for _ in range(20):
+        profile = random_profile(vocab, rng)
+        got = trl_gate_score_adjustments(profile, trl)
+        want = trl_gate_score_adjustments_original(profile.copy(), trl)
+        assert list(got.items()) == list(want.items())
+
+
+@pytest.mark.parametrize("trl", [None, 0, 3, 4, 5, 6, 9])
+def test_apply_trl_caps_matches_original(trl):
+    models = load_models()
+    vocab = sorted({t for m in models for t in m["tags"]})
+    rng = random.Random(7)
+    foreign = [dict(m) for m in models]
+    for _ in range(10):
+        profile = random_profile(vocab, rng)
+        for pool in (models, foreign):
+            got = apply_trl_caps(score_models_full_scan(profile, pool, len(pool)), trl)
+            want = apply_trl_caps_original(score_models_full_scan(profile, pool, len(pool)), trl)
+            assert [(r["model"]["id"], r["score"]) for r in got] == [(r["model"]["id"], r["score"]) for r in want]
+
+
+def test_filtered_catalogue_uses_catalogue_rows():
+    models = load_models()
+    vocab = sorted({t for m in models for t in m["tags"]})
+    rng = random.Random(4)
+    subset = [m for i, m in enumerate(models) if i % 3]
+    subset.reverse()
+    for _ in range(10):
+        profile = random_profile(vocab, rng)
+        assert score_models(profile, subset, 5) == score_models_full_scan(profile, subset, 5)
+        got = rank_for_trl(profile, 5, subset, 5)
+        want = rank_for_trl_per_call(profile, 5, subset, 5)
+        assert [(r["model"]["id"], r["score"]) for r in got] == [(r["model"]["id"], r["score"]) for r in want]
+
+
+def test_unregistered_tags_leave_registry_unchanged():
+    registry = load_registry()
+    size = len(registry)
+    assert tag_id("not_a_registered_tag") == UNKNOWN_TAG
+    assert list(tag_ids(["not_a_registered_tag", "another_unknown"])) == [UNKNOWN_TAG]
+    assert len(load_registry()) == size
+
+    models = [{"tags": ["not_a_registered_tag", "B2B"]}, {"tags": ["another_unknown"]}]
+    assert list(tag_overlap(models, ["not_a_registered_tag", "another_unknown"])[0]) == [1, 1]
@@ -1,26 +1,101 @@
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
-import json
+
+from utils.data_registry import resolve
+from utils.bm_vector_store import ModelVectorStore
+
+_STORES = {}
+
 
 def load_model_vectors(path="data/bm_model_vectors.json"):
-    with open(path) as f:
-        return json.load(f)
+    """The model vectors as the cached ModelVectorStore (see load_vector_store)."""
+    return load_vector_store(path)
+
+
+def load_vector_store(path="data/bm_model_vectors.json"):
+    """
+    Load the model vectors once per process as a ModelVectorStore.
+    Uses the memory-mapped artifact from `python -m utils.bm_vector_store`
+    when it is present and matches the JSON, otherwise parses the JSON.
+    Reloaded only when the JSON's mtime or size changes.
+    """
+    full = resolve(path)
+    st = full.stat()
+    stat_key = (st.st_mtime_ns, st.st_size)
+    cached = _STORES.get(full)
+    if cached is None or cached[0] != stat_key:
+        cached = _STORES[full] = (stat_key, ModelVectorStore.load(full))
+    return cached[1]
 
 
 def compute_ai_boost(tag_vectors, model_vectors, boost_strength=0.2):
     """
     Compute the soft AI boost based on user tag embeddings.
     tag_vectors = list of embedded vectors (numpy arrays)
+    model_vectors = ModelVectorStore, or the raw {bm_id: vector} dict
     """
     if not tag_vectors:
         return {bm: 0.0 for bm in model_vectors.keys()}
 
-    user_vec = np.mean(np.array(tag_vectors), axis=0).reshape(1, -1)
+    if not isinstance(model_vectors, ModelVectorStore):
+        model_vectors = ModelVectorStore.from_dict(model_vectors)
+
+    user_vec = np.mean(np.array(tag_vectors), axis=0)
+    sims = model_vectors.similarities(user_vec)
+
+    return model_vectors.to_dict(sims.astype(np.float64) * boost_strength)
+
+
+def pool_user_vectors(users, dim):
+    """
+    Mean-pool a cohort into an (N, dim) float32 matrix.
+    users = (N, dim) or (dim,) array, or a list whose items are either a
+    user's tag_vectors list or an already pooled (dim,) vector.
+    Users without tag vectors become zero rows (zero boost).
+    Raises ValueError on any other shape.
+    """
+    if isinstance(users, np.ndarray):
+        users = np.atleast_2d(users)
+        if users.ndim != 2 or users.shape[-1] != dim:
+            raise ValueError(f"expected an (N, {dim}) user matrix, got shape {users.shape}")
+        return users.astype(np.float32, copy=False)
+
+    pooled = np.zeros((len(users), dim), dtype=np.float32)
+    for i, tag_vectors in enumerate(users):
+        if len(tag_vectors) == 0:
+            continue
+        try:
+            vecs = np.asarray(tag_vectors, dtype=np.float32)
+        except ValueError:
+            raise ValueError(f"user {i}: tag vectors have mixed lengths") from None
+        if vecs.ndim == 1 and vecs.shape[0] == dim:
+            pooled[i] = vecs
+        elif vecs.ndim == 2 and vecs.shape[1] == dim:
+            pooled[i] = vecs.mean(axis=0)
+        else:
+            raise ValueError(f"user {i}: expected a ({dim},) vector or (k, {dim}) tag vectors, "
+                             f"got shape {vecs.shape}")
+    return pooled
+
+
+def compute_ai_boost_batch(users, model_vectors, boost_strength=0.2, chunk_size=1024):
+    """
+    Batched compute_ai_boost for a whole cohort.
+    Returns an (N users, models) boost matrix whose columns follow
+    model_vectors.ids. Users are scored chunk_size at a time so the
+    working set stays bounded for very large cohorts.
+    """
+    if not isinstance(model_vectors, ModelVectorStore):
+        model_vectors = ModelVectorStore.from_dict(model_vectors)
+
+    dim = model_vectors.matrix.shape[1]
+    if isinstance(users, np.ndarray):
+        users = pool_user_vectors(users, dim)
+    n = len(users)
+    boosts = np.empty((n, len(model_vectors)), dtype=np.float32)
 
-    boosts = {}
-    for bm, vec in model_vectors.items():
-        model_vec = np.array(vec).reshape(1, -1)
-        sim = cosine_similarity(user_vec, model_vec)[0][0]
-        boosts[bm] = sim * boost_strength
+    for start in range(0, n, chunk_size):
+        block = pool_user_vectors(users[start:start + chunk_size], dim)
+        boosts[start:start + len(block)] = model_vectors.similarities_batch(block)
 
+    boosts *= boost_strength
     return boosts
@@ -0,0 +1,165 @@
+import itertools
+
+import numpy as np
+
+MATURITY_MAP = {
+    "emerging": 0.3,
+    "established": 0.6,
+    "dominant": 1.0
+}
+
+# (tag overlap, success score, maturity) coefficients used by the selector
+SCORE_WEIGHTS = (0.5, 0.3, 0.2)
+
+
+def score_model(model, archetype_tags, weights=SCORE_WEIGHTS):
+    tag_overlap = len(set(model["tags"]) & set(archetype_tags)) / len(model["tags"])
+    maturity_w = MATURITY_MAP[model["maturity_level"]]
+    success = model["success_score"]
+
+    w_overlap, w_success, w_maturity = weights
+    final_score = (w_overlap * tag_overlap) + (w_success * success) + (w_maturity * maturity_w)
+    return final_score
+
+
+def model_features(models, archetype_tags):
+    """
+    (models, 3) array of the score_model inputs: tag overlap, success, maturity.
+    score_model(m, tags, w) == model_features(models, tags) @ w, row by row.
+    The overlap counts come from the catalogue's tag index.
+    """
+    from utils.model_logic import tag_overlap
+
+    overlap = tag_overlap(models, archetype_tags)[0]
+    return np.array([
+        [
+            overlap[i] / len(m["tags"]),
+            m["success_score"],
+            MATURITY_MAP[m["maturity_level"]],
+        ]
+        for i, m in enumerate(models)
+    ])
+
+
+# ============================================================
+# ---------- PRECOMPUTED RANKING TABLE ----------
+# ============================================================
+
+# The selector's refinement questions, in page order
+SECONDARY_QUESTIONS = (
+    ("q1", "How fast do you want to commercialize?",
+     ("Slow & Research-heavy", "Moderate", "Fast")),
+    ("q2", "Which is more important to you?",
+     ("Recurring revenue", "Impact outcomes", "User scale", "Technology depth")),
+    ("q3", "What is your available startup capital?",
+     ("Very low (< R50k)", "Medium", "High")),
+)
+
+# {(question key, option): extra archetype tags}. Empty until the answers
+# (or secondary_questions.json ids such as "S1") are wired into scoring;
+# the table picks new entries up on its next rebuild.
+REFINEMENTS = {}
+
+
+def refined_tags(archetype_tags, answers, refinements=REFINEMENTS):
+    """Archetype tags plus the tags each (question, option) answer adds."""
+    tags = set(archetype_tags)
+    for key_option in answers:
+        tags.update(refinements.get(key_option, ()))
+    return tags
+
+
+def rank_models(models, tags, weights=SCORE_WEIGHTS):
+    """
+    (order, scores): model indices best first and their score_model values.
+    Same result and tie order as sorting score_model(...) descending.
+    """
+    f = model_features(models, tags)
+    w_overlap, w_success, w_maturity = weights
+    scores = (w_overlap * f[:, 0]) + (w_success * f[:, 1]) + (w_maturity * f[:, 2])
+    order = np.argsort(-scores, kind="stable")
+    return order, scores[order]
+
+
+class RankingTable:
+    """
+    Every reachable (archetype, q1, q2, q3) combination pre-ranked.
+    Combinations that resolve to the same tag set share one row, so
+    orders / scores are (distinct profiles, models) arrays.
+    """
+
+    def __init__(self, models, archetype_tags, questions=SECONDARY_QUESTIONS,
+                 refinements=REFINEMENTS, weights=SCORE_WEIGHTS):
+        self.models = models
+        self.question_keys = tuple(q[0] for q in questions)
+        self.lookup = {}
+        rows, orders, scores = {}, [], []
+
+        for archetype, base in archetype_tags.items():
+            for combo in itertools.product(*(q[2] for q in questions)):
+                answers = list(zip(self.question_keys, combo))
+                tags = frozenset(refined_tags(base, answers, refinements))
+                if tags not in rows:
+                    order, s = rank_models(models, tags, weights)
+                    rows[tags] = len(orders)
+                    orders.append(order)
+                    scores.append(s)
+                self.lookup[(archetype, *combo)] = rows[tags]
+
+        self.orders = np.array(orders, dtype=np.int16).reshape(len(orders), len(models))
+        self.scores = np.array(scores, dtype=np.float64).reshape(len(orders), len(models))
+
+    def ranked(self, archetype, *answers, k=None):
+        """[(model, score)] best first for one archetype and its answers."""
+        r = self.lookup[(archetype, *answers)]
+        order = self.orders[r] if k is None else self.orders[r, :k]
+        return [(self.models[i], float(s)) for i, s in zip(order, self.scores[r])]
+
+
+_TABLES = {}
+
+
+def ranking_table():
+    """RankingTable for the current catalogue; rebuilt when either data file changes."""
+    from utils.data_loader import BASE_DIR, _with_tag_ids, load_business_models, load_json
+    from utils.data_registry import asset_digest
+
+    key = (
+        asset_digest(BASE_DIR / "data/business_models.json", _with_tag_ids),
+        asset_digest(BASE_DIR / "data/archetype_tags.json"),
+        tuple(sorted((k, tuple(v)) for k, v in REFINEMENTS.items())),
+    )
+    if key not in _TABLES:
+        _TABLES.clear()
+        _TABLES[key] = RankingTable(load_business_models(), load_json("data/archetype_tags.json"))
+    return _TABLES[key]
+
+
+def check_table_parity(table=None):
+    """Max |score| difference and any order mismatch against score_model, per combination."""
+    table = table or ranking_table()
+    from utils.data_loader import load_json
+
+    archetype_tags = load_json("data/archetype_tags.json")
+    worst, mismatches = 0.0, []
+    for combo in table.lookup:
+        archetype, answers = combo[0], list(zip(table.question_keys, combo[1:]))
+        tags = refined_tags(archetype_tags[archetype], answers)
+        expected = sorted(((m, score_model(m, tags)) for m in table.models), key=lambda x: x[1], reverse=True)
+        got = table.ranked(*combo)
+        if [m["id"] for m, _ in got] != [m["id"] for m, _ in expected]:
+            mismatches.append(combo)
+        worst = max(worst, max(abs(a[1] - b[1]) for a, b in zip(got, expected)))
+    return worst, mismatches
+
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    table = ranking_table()
+    build_ms = (time.perf_counter() - start) * 1e3
+    print(f"{len(table.lookup)} combinations -> {len(table.orders)} distinct rankings "
+          f"({table.orders.nbytes + table.scores.nbytes} bytes), built in {build_ms:.1f} ms")
+    worst, mismatches = check_table_parity(table)
+    print(f"parity vs score_model: max |diff| {worst:.2e}, {len(mismatches)} order mismatches")
@@ -0,0 +1,137 @@
+"""
+Overnight batch scoring of questionnaire exports.
+
+    python -m utils.bm_batch_score answers.jsonl -o ranked.jsonl --top-k 5
+    python -m utils.bm_batch_score answers.csv --workers 8 --chunk-size 1000
+
+Each input row is {question_id: answer_key}. An optional "id" column is
+carried through, and an optional "tags" column (list, or ";"-separated in
+CSV) switches on the AI boost and fusion when model vectors are present.
+Rows are streamed in chunks through a process pool; output is JSONL,
+one line per input row, in input order.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+_RANKER = None
+
+
+def read_rows(path):
+    """Stream answer rows from .csv or .jsonl without loading the file."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            for row in csv.DictReader(f):
+                yield {k: v for k, v in row.items() if v not in (None, "")}
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def chunked(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _init_worker(rules_path, vectors_path, rule_weight, boost_strength):
+    global _RANKER
+    from utils.bm_ai_engine import load_vector_store
+    from utils.bm_pipeline import HybridRanker
+    from utils.bm_rule_engine import load_compiled_rules
+
+    store = load_vector_store(vectors_path) if os.path.exists(vectors_path) else None
+    _RANKER = HybridRanker(load_compiled_rules(rules_path), store,
+                           rule_weight=rule_weight, boost_strength=boost_strength)
+
+
+def _row_tags(row):
+    tags = row.pop("tags", None)
+    if isinstance(tags, str):
+        tags = [t.strip() for t in tags.split(";") if t.strip()]
+    return tags or []
+
+
+def score_chunk(chunk, top_k):
+    from utils.bm_tag_vectors import tag_vectors
+
+    out = []
+    for row in chunk:
+        row = dict(row)
+        row_id = row.pop("id", None)
+        tags = _row_tags(row)
+        vectors = tag_vectors(tags) if tags and _RANKER.store is not None else None
+        ranking = _RANKER.rank(row, vectors, k=top_k)
+        out.append({"id": row_id, "top": ranking.results()})
+    return out
+
+
+def run(src, dst, top_k=5, workers=None, chunk_size=500,
+        rules_path="data/bm_rule_weights.json",
+        vectors_path="data/bm_model_vectors.json",
+        rule_weight=0.7, boost_strength=0.2):
+    """
+    Score every row of src and stream results to dst.
+    At most 2 x workers chunks are in flight, so memory stays bounded.
+    Returns (rows scored, seconds).
+    """
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    n = 0
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(rules_path, vectors_path, rule_weight, boost_strength)) as pool:
+        pending = deque()
+
+        def drain(limit):
+            nonlocal n
+            while len(pending) > limit:
+                for result in pending.popleft().result():
+                    dst.write(json.dumps(result) + "\n")
+                    n += 1
+
+        for chunk in chunked(read_rows(src), chunk_size):
+            pending.append(pool.submit(score_chunk, chunk, top_k))
+            drain(2 * workers)
+        drain(0)
+
+    return n, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-score questionnaire answers.")
+    parser.add_argument("src", help="answers as .csv or .jsonl")
+    parser.add_argument("-o", "--output", help="JSONL output (default: stdout)")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--rules", default="data/bm_rule_weights.json")
+    parser.add_argument("--vectors", default="data/bm_model_vectors.json")
+    parser.add_argument("--rule-weight", type=float, default=0.7)
+    parser.add_argument("--boost-strength", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    dst = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        n, seconds = run(args.src, dst, args.top_k, args.workers, args.chunk_size,
+                         args.rules, args.vectors, args.rule_weight, args.boost_strength)
+    finally:
+        if dst is not sys.stdout:
+            dst.close()
+
+    rate = n / seconds if seconds else float("inf")
+    print(f"scored {n} rows in {seconds:.2f}s ({rate:,.0f} rows/sec)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import numpy as np
+
+from utils.bm_ai_engine import load_vector_store
+from utils.bm_rule_engine import load_compiled_rules
+from utils.bm_vector_store import top_k_rows
+
+
+class HybridRanking:
+    """
+    Aligned score arrays over the ranker's fixed model index.
+    rule, ai and fused keep every model's components, so any result can be
+    explained without recomputing.
+    """
+
+    def __init__(self, model_ids, rule, ai, fused, top):
+        self.model_ids = model_ids
+        self.rule = rule
+        self.ai = ai
+        self.fused = fused
+        self.top = top
+
+    def results(self):
+        """Top-k as [{model_id, score, rule, ai}], best first."""
+        return [self.explain_row(i) for i in self.top]
+
+    def explain_row(self, i):
+        return {
+            "model_id": self.model_ids[i],
+            "score": float(self.fused[i]),
+            "rule": float(self.rule[i]),
+            "ai": float(self.ai[i]),
+        }
+
+    def explain(self, model_id):
+        return self.explain_row(self.model_ids.index(model_id))
+
+    def as_dict(self):
+        """Same {model_id: fused score} shape as fuse_scores."""
+        return dict(zip(self.model_ids, self.fused.tolist()))
+
+
+class HybridRanker:
+    """
+    compute_rule_score -> compute_ai_boost -> fuse_scores as one pass over
+    NumPy arrays. The model index is the rule engine's model set, matching
+    fuse_scores, which only scores models present in the rules.
+    Without model vectors the AI component is zero (rule-only ranking).
+    """
+
+    def __init__(self, compiled_rules=None, vector_store=None,
+                 rule_weight=0.7, boost_strength=0.2):
+        self.rules = compiled_rules or load_compiled_rules()
+        if vector_store is None:
+            try:
+                vector_store = load_vector_store()
+            except FileNotFoundError:
+                vector_store = None
+        self.store = vector_store
+        self.rule_weight = rule_weight
+        self.boost_strength = boost_strength
+
+        self.model_ids = list(self.rules.model_ids)
+        index = self.store.index if self.store is not None else {}
+        store_rows = np.array([index.get(bm, -1) for bm in self.model_ids], dtype=np.intp)
+        self._has_vector = store_rows >= 0
+        self._store_rows = store_rows[self._has_vector]
+
+    def similarities(self, tag_vectors):
+        """Raw cosine similarity per model (0 without vectors), before boost_strength."""
+        sims = np.zeros(len(self.model_ids))
+        if self.store is not None and tag_vectors is not None and len(tag_vectors):
+            user_vec = np.mean(np.asarray(tag_vectors, dtype=np.float32), axis=0)
+            sims[self._has_vector] = self.store.similarities(user_vec)[self._store_rows]
+        return sims
+
+    def ai_scores(self, tag_vectors):
+        return self.similarities(tag_vectors) * self.boost_strength
+
+    def rank(self, selected_answers=None, tag_vectors=None, k=5,
+             question_importance=1.0, rule_scores=None):
+        """
+        Score every model and select the top k.
+        rule_scores may be passed in directly, e.g. IncrementalRuleScorer.scores.
+        """
+        if rule_scores is None:
+            rule_scores = self.rules.score_vector(selected_answers or {}, question_importance)
+        rule = np.asarray(rule_scores, dtype=np.float64)
+        ai = self.ai_scores(tag_vectors)
+
+        fused = rule * self.rule_weight + ai * (1 - self.rule_weight)
+        return HybridRanking(self.model_ids, rule, ai, fused, top_k_rows(fused, k))
@@ -0,0 +1,155 @@
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from utils.bm_ai_engine import compute_ai_boost
+from utils.bm_vector_index import sample_queries
+from utils.bm_vector_store import ModelVectorStore, file_sha256, top_k_rows
+
+
+class QuantizedVectorStore:
+    """
+    Compact first-pass copy of a ModelVectorStore.
+
+    mode="int8":  each row stored as int8 codes with its own float32 scale.
+    mode="pca16": rows projected onto the top `dims` principal axes, float16.
+                  The projection matrix is fixed-size, so this only pays off
+                  once the catalogue is much larger than `dims`.
+
+    top_k scores every model on the compact codes, then re-ranks the best
+    `rerank` candidates against the full-precision store.
+    """
+
+    def __init__(self, store, mode, codes, scales=None, mean=None, components=None):
+        self.store = store
+        self.mode = mode
+        self.codes = codes
+        self.scales = scales
+        self.mean = mean
+        self.components = components
+        self.meta = {}
+
+    @classmethod
+    def build(cls, store, mode="int8", dims=64):
+        matrix = np.asarray(store.matrix, dtype=np.float32)
+
+        if mode == "int8":
+            scales = np.abs(matrix).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            codes = np.round(matrix / scales[:, None]).astype(np.int8)
+            return cls(store, mode, codes, scales=scales.astype(np.float32))
+
+        if mode == "pca16":
+            mean = matrix.mean(axis=0)
+            _, _, vt = np.linalg.svd(matrix - mean, full_matrices=False)
+            components = vt[:dims].astype(np.float16)
+            codes = ((matrix - mean) @ components.T.astype(np.float32)).astype(np.float16)
+            return cls(store, mode, codes, mean=mean, components=components)
+
+        raise ValueError(f"Unknown quantisation mode: {mode}")
+
+    @property
+    def nbytes(self):
+        extra = sum(a.nbytes for a in (self.scales, self.mean, self.components) if a is not None)
+        return self.codes.nbytes + extra
+
+    def approx_similarities(self, user_vec):
+        """First-pass scores over every model (proportional to cosine)."""
+        user_vec = np.asarray(user_vec, dtype=np.float32).ravel()
+        user_vec = user_vec / (np.linalg.norm(user_vec) or 1.0)
+
+        if self.mode == "int8":
+            return (self.codes @ user_vec) * self.scales
+
+        projected = (user_vec - self.mean) @ self.components.T.astype(np.float32)
+        return self.codes.astype(np.float32) @ projected + float(self.mean @ user_vec)
+
+    def top_k(self, user_vec, k=5, rerank=None):
+        """Quantised first pass, then exact re-ranking of the best `rerank` rows."""
+        rerank = max(k, rerank or 4 * k)
+        rows = top_k_rows(self.approx_similarities(user_vec), rerank)
+
+        user_vec = np.asarray(user_vec, dtype=np.float32).ravel()
+        user_vec = user_vec / (np.linalg.norm(user_vec) or 1.0)
+        sims = np.asarray(self.store.matrix[rows]) @ user_vec
+        best = top_k_rows(sims, k)
+        return self.store.ids[rows[best]], sims[best]
+
+    def save(self, path, **meta):
+        arrays = {"codes": self.codes, "ids": self.store.ids}
+        for name in ("scales", "mean", "components"):
+            if getattr(self, name) is not None:
+                arrays[name] = getattr(self, name)
+        np.savez(path, mode=self.mode, meta=json.dumps(meta), **arrays)
+
+    @classmethod
+    def load(cls, path, store, source="data/bm_model_vectors.json"):
+        """Load saved codes; raises ValueError if `source` changed since they were built."""
+        data = np.load(path)
+        if data["ids"].tolist() != store.keys():
+            raise ValueError(f"{path} was built for a different model catalogue")
+        meta = json.loads(str(data["meta"]))
+        if meta.get("source_sha256") != file_sha256(source):
+            raise ValueError(f"{path} is stale: {source} changed since it was built; "
+                             f"rerun python -m utils.bm_quantize")
+        qstore = cls(
+            store, str(data["mode"]), data["codes"],
+            scales=data["scales"] if "scales" in data else None,
+            mean=data["mean"] if "mean" in data else None,
+            components=data["components"] if "components" in data else None,
+        )
+        qstore.meta = meta
+        return qstore
+
+
+def ranking_agreement(qstore, queries, k=5, rerank=None):
+    """
+    Compare the quantised ranking with compute_ai_boost on the same queries.
+    first_pass_overlap: top-k overlap using quantised scores alone.
+    reranked_overlap:   top-k overlap after exact re-ranking.
+    spearman:           rank correlation of first-pass vs exact scores.
+    """
+    store = qstore.store
+    first, reranked, spearman = [], [], []
+
+    for q in queries:
+        exact = compute_ai_boost([q], store, boost_strength=1.0)
+        exact_scores = np.array([exact[bm] for bm in store.keys()])
+        exact_top = set(store.ids[top_k_rows(exact_scores, k)].tolist())
+
+        approx = qstore.approx_similarities(q)
+        first.append(len(exact_top & set(store.ids[top_k_rows(approx, k)].tolist())) / k)
+
+        ids, _ = qstore.top_k(q, k, rerank)
+        reranked.append(len(exact_top & set(ids.tolist())) / k)
+
+        ra = np.argsort(np.argsort(approx))
+        re = np.argsort(np.argsort(exact_scores))
+        spearman.append(np.corrcoef(ra, re)[0, 1])
+
+    return {
+        "k": k,
+        "first_pass_overlap": float(np.mean(first)),
+        "reranked_overlap": float(np.mean(reranked)),
+        "spearman": float(np.mean(spearman)),
+    }
+
+
+if __name__ == "__main__":
+    src = sys.argv[1] if len(sys.argv) > 1 else "data/bm_model_vectors.json"
+    store = ModelVectorStore.load(src)
+    queries = sample_queries(store)
+    full_bytes = np.asarray(store.matrix).nbytes
+
+    for mode in ("int8", "pca16"):
+        qstore = QuantizedVectorStore.build(store, mode)
+        metrics = ranking_agreement(qstore, queries)
+        out = Path(src).with_suffix(f".{mode}.npz")
+        qstore.save(out, source_sha256=file_sha256(src), agreement=metrics)
+        print(
+            f"wrote {out}: {qstore.nbytes / full_bytes:.0%} of float32 size, "
+            f"top-{metrics['k']} overlap {metrics['first_pass_overlap']:.3f} first pass / "
+            f"{metrics['reranked_overlap']:.3f} re-ranked, spearman {metrics['spearman']:.3f}"
+        )
@@ -1,13 +1,16 @@
-import json
+import numpy as np
+
+from utils.data_registry import get_asset
+
 
 def load_rules(path="data/bm_rule_weights.json"):
-    with open(path) as f:
-        return json.load(f)
+    return get_asset(path)
 
 
-def normalize_rule_weights(rules):
+def normalize_rule_weights(rules, compiled=False):
     """
     Normalize model weights inside each answer so no question dominates.
+    compiled=True returns the sparse CompiledRules form instead of dicts.
     """
     normalized = {}
 
@@ -28,13 +31,88 @@ def normalize_rule_weights(rules):
                 bm: v / total for bm, v in models.items()
             }
 
+    if compiled:
+        return CompiledRules(normalized)
     return normalized
 
 
+class CompiledRules:
+    """
+    Normalized rule weights as a sparse answer x model matrix (CSR layout).
+    rows:    {(qid, answer_key): row}
+    columns: {bm_id: column}, with model_ids[column] the reverse mapping
+    """
+
+    def __init__(self, normalized_rules):
+        self.model_ids = sorted({
+            bm for answers in normalized_rules.values()
+            for weights in answers.values() for bm in weights
+        })
+        self.columns = {bm: c for c, bm in enumerate(self.model_ids)}
+        self.rows = {}
+
+        indptr, indices, data = [0], [], []
+        for qid, answers in normalized_rules.items():
+            for answer_key, weights in answers.items():
+                self.rows[(qid, answer_key)] = len(self.rows)
+                for bm, w in weights.items():
+                    indices.append(self.columns[bm])
+                    data.append(w)
+                indptr.append(len(indices))
+
+        self.indptr = np.array(indptr, dtype=np.int64)
+        self.indices = np.array(indices, dtype=np.int64)
+        self.data = np.array(data, dtype=np.float64)
+
+    def answer_rows(self, selected_answers):
+        """Matrix rows for {qid: answer_key}; unknown answers are skipped."""
+        return [
+            self.rows[(qid, ans)] for qid, ans in selected_answers.items()
+            if (qid, ans) in self.rows
+        ]
+
+    def row(self, r):
+        """(model columns, weights) of one answer row."""
+        lo, hi = self.indptr[r], self.indptr[r + 1]
+        return self.indices[lo:hi], self.data[lo:hi]
+
+    def score_vector(self, selected_answers, question_importance=1.0):
+        """Sparse row-sum of the selected answers -> per-model score array."""
+        rows = self.answer_rows(selected_answers)
+        if not rows:
+            return np.zeros(len(self.model_ids))
+
+        spans = [self.row(r) for r in rows]
+        scores = np.bincount(np.concatenate([s[0] for s in spans]),
+                             weights=np.concatenate([s[1] for s in spans]),
+                             minlength=len(self.model_ids))
+        return scores * question_importance
+
+    def to_dict(self, scores):
+        return dict(zip(self.model_ids, scores.tolist()))
+
+
+def _compile(rules):
+    return normalize_rule_weights(rules, compiled=True)
+
+
+def load_compiled_rules(path="data/bm_rule_weights.json"):
+    """
+    Compiled, normalized rules cached per process by the data registry.
+    Rebuilt only when the rules file's content hash changes.
+    """
+    return get_asset(path, _compile)
+
+
 def compute_rule_score(selected_answers, normalized_rules, question_importance=1.0):
     """
     Computes the deterministic (explainable) rules engine score.
+    normalized_rules = CompiledRules, or the dict from normalize_rule_weights
     """
+    if isinstance(normalized_rules, CompiledRules):
+        scores = normalized_rules.score_vector(selected_answers, question_importance)
+        return normalized_rules.to_dict(scores)
+
     # Initialize model scores
     all_models = set()
     for qid in normalized_rules:
@@ -55,3 +133,101 @@ def compute_rule_score(selected_answers, normalized_rules, question_importance=1
 
     return scores
 
+
+class IncrementalRuleScorer:
+    """
+    Running rule scores for a live questionnaire, kept in session state.
+    Selecting, changing or clearing one answer applies only that answer's
+    row delta, so the cost is O(models touched by the answer).
+    """
+
+    def __init__(self, compiled, question_importance=1.0):
+        self.compiled = compiled
+        self.question_importance = question_importance
+        self.selected = {}
+        self.scores = np.zeros(len(compiled.model_ids))
+
+    def _apply(self, qid, ans, sign):
+        r = self.compiled.rows.get((qid, ans))
+        if r is None:
+            return
+        cols, weights = self.compiled.row(r)
+        self.scores[cols] += sign * self.question_importance * weights
+
+    def select(self, qid, ans):
+        """Set (or change) the answer to one question."""
+        if self.selected.get(qid) == ans:
+            return
+        self.clear(qid)
+        self.selected[qid] = ans
+        self._apply(qid, ans, 1.0)
+
+    def clear(self, qid):
+        ans = self.selected.pop(qid, None)
+        if ans is not None:
+            self._apply(qid, ans, -1.0)
+        if not self.selected:
+            self.scores[:] = 0.0
+
+    def reset(self):
+        self.selected = {}
+        self.scores[:] = 0.0
+
+    def recompute(self):
+        """Full recompute from the selected answers (drops float drift)."""
+        self.scores = self.compiled.score_vector(self.selected, self.question_importance)
+        return self.scores
+
+    def as_dict(self):
+        return self.compiled.to_dict(self.scores)
+
+
+def session_rule_scorer(session_state, key="bm_rule_scorer", path="data/bm_rule_weights.json"):
+    """
+    Fetch the IncrementalRuleScorer kept in st.session_state, creating it on
+    first use or when the compiled rules have been rebuilt.
+    """
+    compiled = load_compiled_rules(path)
+    scorer = session_state.get(key)
+    if scorer is None or scorer.compiled is not compiled:
+        previous = scorer.selected if scorer is not None else {}
+        scorer = IncrementalRuleScorer(compiled)
+        for qid, ans in previous.items():
+            scorer.select(qid, ans)
+        session_state[key] = scorer
+    return scorer
+
+
+def check_incremental_parity(compiled, steps=1000, seed=0):
+    """
+    Drive an IncrementalRuleScorer through random select/change/clear steps
+    and compare with compute_rule_score after every step.
+    Returns (max abs deviation, whether every ranking matched).
+    """
+    rng = np.random.default_rng(seed)
+    answers = {}
+    for qid, ans in compiled.rows:
+        answers.setdefault(qid, []).append(ans)
+    qids = list(answers)
+
+    scorer = IncrementalRuleScorer(compiled)
+    worst, ranks_match = 0.0, True
+    for _ in range(steps):
+        qid = qids[rng.integers(len(qids))]
+        if rng.random() < 0.2:
+            scorer.clear(qid)
+        else:
+            scorer.select(qid, answers[qid][rng.integers(len(answers[qid]))])
+
+        full = compiled.score_vector(scorer.selected)
+        worst = max(worst, float(np.abs(scorer.scores - full).max()))
+        ranks_match &= bool(np.array_equal(
+            np.argsort(-np.round(scorer.scores, 9), kind="stable"),
+            np.argsort(-np.round(full, 9), kind="stable"),
+        ))
+    return worst, ranks_match
+
+
+if __name__ == "__main__":
+    deviation, ranks_match = check_incremental_parity(load_compiled_rules())
+    print(f"incremental vs full recompute: max deviation {deviation:.2e}, rankings match: {ranks_match}")
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import sys
+from collections import defaultdict
+from functools import lru_cache
+
+import numpy as np
+
+from utils.bm_vector_store import (
+    ARTIFACT_VERSION, ModelVectorStore, artifact_paths, file_sha256, write_artifact,
+)
+
+TAG_TABLE_PATH = "data/bm_tag_vectors.json"  # artifact stem; no JSON is written
+SOURCES = {
+    "models": "data/business_models.json",
+    "archetypes": "data/archetype_tags.json",
+    "rules": "data/bm_rule_weights.json",
+    "vectors": "data/bm_model_vectors.json",
+}
+
+
+# ============================================================
+# ---------- BUILD ----------
+# ============================================================
+
+def sources_sha256(sources=SOURCES):
+    h = hashlib.sha256()
+    for key in sorted(sources):
+        h.update(file_sha256(sources[key]).encode())
+    return h.hexdigest()
+
+
+def tag_model_links(sources=SOURCES):
+    """
+    {tag: {bm_id: weight}} from every place a tag is tied to a model:
+    the model's own tag list (weight 1) and rule answers that carry both
+    tags and models (tag weight x model weight, positive weights only).
+    """
+    links = defaultdict(lambda: defaultdict(float))
+
+    with open(sources["models"], encoding="utf-8") as f:
+        for m in json.load(f):
+            for t in m.get("tags", []):
+                links[t][m["id"]] += 1.0
+
+    with open(sources["rules"], encoding="utf-8") as f:
+        rules = json.load(f)
+    for answers in rules.values():
+        for detail in answers.values():
+            for t, tw in detail.get("tags", {}).items():
+                for bm, mw in detail.get("models", {}).items():
+                    if tw > 0 and mw > 0:
+                        links[t][bm] += tw * mw
+
+    return links
+
+
+def build_tag_table(sources=SOURCES, encoder=None):
+    """
+    Embed every tag in the model catalogue, archetype tags and rule weights.
+
+    A tag's vector is the link-weighted mean of the model vectors it is tied
+    to, so tags live in the same space as bm_model_vectors. Archetype tags
+    with no model link borrow the mean of the other tags in their archetype,
+    unless an `encoder(list_of_tags) -> array` is given for them.
+    Returns (store, missing_tags).
+    """
+    models = ModelVectorStore.load(sources["vectors"])
+    links = tag_model_links(sources)
+
+    with open(sources["archetypes"], encoding="utf-8") as f:
+        archetypes = json.load(f)
+
+    vectors = {}
+    for t, weights in links.items():
+        rows = [models.index[bm] for bm in weights if bm in models.index]
+        if rows:
+            w = np.array([weights[models.ids[r]] for r in rows], dtype=np.float32)
+            vectors[t] = w @ np.asarray(models.matrix)[rows] / w.sum()
+
+    unlinked = sorted({t for tags in archetypes.values() for t in tags} - set(vectors))
+    if encoder is not None and unlinked:
+        for t, vec in zip(unlinked, encoder(unlinked)):
+            vectors[t] = np.asarray(vec, dtype=np.float32)
+    else:
+        for tags in archetypes.values():
+            siblings = [vectors[t] for t in tags if t in vectors]
+            for t in tags:
+                if t not in vectors and siblings:
+                    vectors[t] = np.mean(siblings, axis=0)
+
+    all_tags = set(links) | {t for tags in archetypes.values() for t in tags}
+    missing = sorted(all_tags - set(vectors))
+
+    tags = sorted(vectors)
+    return ModelVectorStore(tags, np.array([vectors[t] for t in tags])), missing
+
+
+def compile_tag_table(path=TAG_TABLE_PATH, sources=SOURCES, encoder=None):
+    store, missing = build_tag_table(sources, encoder)
+    outputs = write_artifact(path, store.ids, store.matrix, sources_sha256(sources), missing=missing)
+    return outputs, missing
+
+
+# ============================================================
+# ---------- LOOKUP ----------
+# ============================================================
+
+@lru_cache(maxsize=None)
+def load_tag_table(path=TAG_TABLE_PATH):
+    """
+    Tag -> vector table, memory-mapped when the compiled artifact is fresh,
+    otherwise built in memory from the source files.
+    """
+    _, idx_path = artifact_paths(path)
+    if idx_path.exists():
+        with open(idx_path) as f:
+            meta = json.load(f)
+        if meta.get("version") == ARTIFACT_VERSION and meta.get("source_sha256") == sources_sha256():
+            return ModelVectorStore.from_artifact(path)
+    return build_tag_table()[0]
+
+
+@lru_cache(maxsize=4096)
+def _pooled(tag_key):
+    table = load_tag_table()
+    rows = [table.index[t] for t in tag_key if t in table.index]
+    if not rows:
+        return None
+    vec = np.asarray(table.matrix[rows]).mean(axis=0)
+    vec.setflags(write=False)
+    return vec
+
+
+def user_vector(tags):
+    """Mean-pooled embedding of a tag profile (None if no tag is known)."""
+    return _pooled(tuple(sorted(set(tags))))
+
+
+def tag_vectors(tags):
+    """
+    compute_ai_boost input for a tag profile: a one-element list holding
+    the cached pooled vector, or [] when none of the tags are known.
+    """
+    vec = user_vector(tags)
+    return [] if vec is None else [vec]
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else TAG_TABLE_PATH
+    outputs, missing = compile_tag_table(path)
+    for out in outputs:
+        print(f"wrote {out}")
+    if missing:
+        print(f"no vector for {len(missing)} tags: {', '.join(missing)}")
@@ -0,0 +1,184 @@
+"""
+Grid search for the hybrid and archetype ranking constants.
+
+    python -m utils.bm_tuning labelled.jsonl --k 1 3 5
+
+Each labelled line is a past profile with the model eventually chosen:
+    {"answers": {qid: answer_key}, "tags": [...], "archetype": "...", "chosen": "BM12"}
+"answers"/"tags" feed the rule_weight x boost_strength sweep,
+"archetype" feeds the score_model coefficient sweep. Either may be absent.
+
+Every grid point is evaluated with broadcast array operations: the profile
+x model score matrices are built once, and each block of grid points is
+combined, ranked and reduced to hit@k / MRR without Python loops.
+"""
+import argparse
+import json
+
+import numpy as np
+
+from utils.bm_archetype import SCORE_WEIGHTS, model_features
+from utils.bm_pipeline import HybridRanker
+from utils.data_loader import load_business_models, load_json
+from utils.bm_tag_vectors import user_vector
+
+# Upper bound on grid x profiles x models elements materialised at once
+BLOCK_ELEMENTS = 1 << 23
+
+
+def chosen_ranks(scores, chosen):
+    """
+    0-based rank of the chosen model for every grid point and profile.
+    scores: (G, P, M); chosen: (P,) column indices.
+    Ties are broken by catalogue order, as a stable descending sort would.
+    """
+    p = np.arange(scores.shape[1])
+    target = scores[:, p, chosen][:, :, None]
+    before = np.arange(scores.shape[2])[None, :] < chosen[:, None]
+    return (scores > target).sum(axis=2) + ((scores == target) & before[None]).sum(axis=2)
+
+
+def sweep(combine, n_points, n_profiles, n_models, chosen, ks):
+    """
+    combine(lo, hi) -> (hi - lo, P, M) scores for grid points lo..hi.
+    Returns {"hit@k": (G,), "mrr": (G,)}.
+    """
+    block = max(1, BLOCK_ELEMENTS // max(1, n_profiles * n_models))
+    ranks = np.empty((n_points, n_profiles), dtype=np.int64)
+    for lo in range(0, n_points, block):
+        hi = min(n_points, lo + block)
+        ranks[lo:hi] = chosen_ranks(combine(lo, hi), chosen)
+
+    metrics = {f"hit@{k}": (ranks < k).mean(axis=1) for k in ks}
+    metrics["mrr"] = (1.0 / (ranks + 1)).mean(axis=1)
+    return metrics
+
+
+# ============================================================
+# ---------- HYBRID: rule_weight x boost_strength ----------
+# ============================================================
+
+def hybrid_matrices(profiles, ranker=None):
+    """
+    Rule scores R and raw cosine similarities S, both (P, M), plus chosen
+    columns. S ignores the ranker's boost_strength (the sweep applies its own).
+    """
+    ranker = ranker or HybridRanker()
+    columns = {bm: c for c, bm in enumerate(ranker.model_ids)}
+
+    rule, sims, chosen = [], [], []
+    for prof in profiles:
+        if prof.get("chosen") not in columns or "answers" not in prof:
+            continue
+        vec = user_vector(prof.get("tags", []))
+        rule.append(ranker.rules.score_vector(prof["answers"]))
+        sims.append(ranker.similarities(None if vec is None else [vec]))
+        chosen.append(columns[prof["chosen"]])
+
+    return np.array(rule), np.array(sims), np.array(chosen, dtype=np.int64)
+
+
+def sweep_hybrid(profiles, rule_weights, boost_strengths, ks=(1, 3, 5)):
+    """
+    hit@k and MRR over the rule_weight x boost_strength grid.
+    fused = rw * R + (1 - rw) * bs * S, exactly as fuse_scores(compute_ai_boost).
+    """
+    R, S, chosen = hybrid_matrices(profiles)
+    rw, bs = np.meshgrid(rule_weights, boost_strengths, indexing="ij")
+    rw, bs = rw.ravel(), bs.ravel()
+    if not len(chosen):
+        return []
+
+    def combine(lo, hi):
+        a = rw[lo:hi, None, None]
+        b = ((1 - rw[lo:hi]) * bs[lo:hi])[:, None, None]
+        return a * R[None] + b * S[None]
+
+    metrics = sweep(combine, len(rw), len(chosen), R.shape[1], chosen, ks)
+    return [
+        dict({"rule_weight": float(rw[g]), "boost_strength": float(bs[g])},
+             **{name: float(v[g]) for name, v in metrics.items()})
+        for g in range(len(rw))
+    ]
+
+
+# ============================================================
+# ---------- ARCHETYPE: score_model coefficients ----------
+# ============================================================
+
+def coefficient_grid(step=0.05):
+    """All (overlap, success, maturity) weights on the simplex w1 + w2 + w3 = 1."""
+    n = int(round(1 / step))
+    return np.array([
+        (i * step, j * step, (n - i - j) * step)
+        for i in range(n + 1) for j in range(n + 1 - i)
+    ])
+
+
+def sweep_archetype(profiles, models, archetype_tags, weights, ks=(1, 3, 5)):
+    """hit@k and MRR of score_model for every coefficient triple in weights (G, 3)."""
+    columns = {m["id"]: c for c, m in enumerate(models)}
+    features = {a: model_features(models, tags) for a, tags in archetype_tags.items()}
+
+    F, chosen = [], []
+    for prof in profiles:
+        if prof.get("archetype") in features and prof.get("chosen") in columns:
+            F.append(features[prof["archetype"]])
+            chosen.append(columns[prof["chosen"]])
+    if not chosen:
+        return []
+    F, chosen = np.array(F), np.array(chosen, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.float64)
+
+    def combine(lo, hi):
+        return np.einsum("gk,pmk->gpm", weights[lo:hi], F)
+
+    metrics = sweep(combine, len(weights), len(chosen), len(models), chosen, ks)
+    return [
+        dict({"weights": [float(w) for w in weights[g]]},
+             **{name: float(v[g]) for name, v in metrics.items()})
+        for g in range(len(weights))
+    ]
+
+
+def _best(report, key):
+    return max(report, key=lambda row: row[key]) if report else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tune ranking constants on labelled profiles.")
+    parser.add_argument("labelled", help="JSONL of past profiles with their chosen model")
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5])
+    parser.add_argument("--steps", type=int, default=21, help="grid points per hybrid axis")
+    parser.add_argument("--coef-step", type=float, default=0.05)
+    parser.add_argument("-o", "--output", help="write the full grid report as JSON")
+    args = parser.parse_args(argv)
+
+    with open(args.labelled, encoding="utf-8") as f:
+        profiles = [json.loads(line) for line in f if line.strip()]
+    models = load_business_models()
+    archetype_tags = load_json("data/archetype_tags.json")
+
+    axis = np.linspace(0.0, 1.0, args.steps)
+    hybrid = sweep_hybrid(profiles, axis, axis, args.k)
+    archetype = sweep_archetype(profiles, models, archetype_tags,
+                                coefficient_grid(args.coef_step), args.k)
+
+    best = _best(hybrid, "mrr")
+    if best:
+        print(f"hybrid: {len(hybrid)} grid points, best MRR {best['mrr']:.3f} at "
+              f"rule_weight={best['rule_weight']:.2f}, boost_strength={best['boost_strength']:.2f}")
+    best = _best(archetype, "mrr")
+    if best:
+        current = sweep_archetype(profiles, models, archetype_tags, [SCORE_WEIGHTS], args.k)[0]
+        print(f"archetype: {len(archetype)} grid points, best MRR {best['mrr']:.3f} at "
+              f"weights={tuple(round(w, 2) for w in best['weights'])} "
+              f"(current {SCORE_WEIGHTS}: {current['mrr']:.3f})")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"hybrid": hybrid, "archetype": archetype}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from utils.bm_vector_store import ModelVectorStore, file_sha256, top_k_rows
+
+
+class IVFIndex:
+    """
+    Approximate nearest-model index (inverted file / IVF bucketing).
+    Model rows are clustered around n_lists spherical k-means centroids.
+    A query only scores the models in its n_probe closest buckets.
+    """
+
+    def __init__(self, store, centroids, assignments, n_probe=2):
+        self.store = store
+        self.centroids = centroids
+        self.n_probe = n_probe
+        order = np.argsort(assignments, kind="stable")
+        counts = np.bincount(assignments, minlength=len(centroids))
+        self.bucket_rows = order
+        self.bucket_offsets = np.concatenate(([0], np.cumsum(counts)))
+
+    @classmethod
+    def build(cls, store, n_lists=None, n_iter=20, seed=0, n_probe=2):
+        """Cluster the store's rows; n_lists defaults to ~sqrt(models)."""
+        n = len(store)
+        n_lists = n_lists or max(1, int(round(np.sqrt(n))))
+        n_lists = min(n_lists, n)
+        rng = np.random.default_rng(seed)
+        matrix = np.asarray(store.matrix)
+
+        centroids = matrix[rng.choice(n, n_lists, replace=False)].copy()
+        for _ in range(n_iter):
+            assignments = np.argmax(matrix @ centroids.T, axis=1)
+            for c in range(n_lists):
+                members = matrix[assignments == c]
+                if len(members):
+                    centre = members.sum(axis=0)
+                    centroids[c] = centre / (np.linalg.norm(centre) or 1.0)
+        assignments = np.argmax(matrix @ centroids.T, axis=1)
+        return cls(store, centroids, assignments, n_probe=n_probe)
+
+    def candidates(self, user_vec, n_probe=None):
+        """Store rows in the n_probe buckets closest to the query."""
+        n_probe = min(n_probe or self.n_probe, len(self.centroids))
+        buckets = top_k_rows(self.centroids @ user_vec, n_probe)
+        return np.concatenate([
+            self.bucket_rows[self.bucket_offsets[b]:self.bucket_offsets[b + 1]]
+            for b in buckets
+        ])
+
+    def top_k(self, user_vec, k=5, n_probe=None):
+        """Approximate top-k: exact cosine scores, but only over the probed buckets."""
+        user_vec = np.asarray(user_vec, dtype=np.float32).ravel()
+        user_vec = user_vec / (np.linalg.norm(user_vec) or 1.0)
+        rows = self.candidates(user_vec, n_probe)
+        sims = np.asarray(self.store.matrix[rows]) @ user_vec
+        best = top_k_rows(sims, k)
+        return self.store.ids[rows[best]], sims[best]
+
+    def save(self, path, source_sha256):
+        """Store the offline-built buckets as .npz next to the vectors."""
+        assignments = np.empty(len(self.store), dtype=np.int32)
+        for b in range(len(self.centroids)):
+            assignments[self.bucket_rows[self.bucket_offsets[b]:self.bucket_offsets[b + 1]]] = b
+        np.savez(path, centroids=self.centroids, assignments=assignments,
+                 ids=self.store.ids, source_sha256=source_sha256)
+
+    @classmethod
+    def load(cls, path, store, n_probe=2, source="data/bm_model_vectors.json"):
+        """Load saved buckets; raises ValueError if `source` changed since they were built."""
+        data = np.load(path)
+        if data["ids"].tolist() != store.keys():
+            raise ValueError(f"{path} was built for a different model catalogue")
+        if str(data["source_sha256"]) != file_sha256(source):
+            raise ValueError(f"{path} is stale: {source} changed since it was built; "
+                             f"rerun python -m utils.bm_vector_index")
+        return cls(store, data["centroids"], data["assignments"], n_probe=n_probe)
+
+
+def sample_queries(store, n=200, noise=0.5, seed=0):
+    """Synthetic user vectors: model rows blended with Gaussian noise."""
+    rng = np.random.default_rng(seed)
+    matrix = np.asarray(store.matrix)
+    base = matrix[rng.integers(0, len(store), n)]
+    jitter = rng.normal(size=base.shape).astype(np.float32)
+    jitter /= np.linalg.norm(jitter, axis=1, keepdims=True)
+    return base + noise * jitter
+
+
+def measure_recall(index, queries, k=5, n_probe=None):
+    """Mean recall@k of the approximate index against exact search."""
+    hits = 0
+    for q in queries:
+        exact, _ = index.store.top_k(q, k)
+        approx, _ = index.top_k(q, k, n_probe=n_probe)
+        hits += len(set(exact.tolist()) & set(approx.tolist()))
+    return hits / (len(queries) * min(k, len(index.store)))
+
+
+def recall_report(index, queries, k=5):
+    """Recall@k and candidate fraction for every n_probe setting."""
+    report = []
+    for n_probe in range(1, len(index.centroids) + 1):
+        scanned = np.mean([
+            len(index.candidates(q / (np.linalg.norm(q) or 1.0), n_probe)) for q in queries
+        ])
+        report.append({
+            "n_probe": n_probe,
+            "recall": measure_recall(index, queries, k, n_probe),
+            "scanned": scanned / len(index.store),
+        })
+    return report
+
+
+if __name__ == "__main__":
+    src = sys.argv[1] if len(sys.argv) > 1 else "data/bm_model_vectors.json"
+    store = ModelVectorStore.load(src)
+    index = IVFIndex.build(store)
+    out = Path(src).with_suffix(".ivf.npz")
+    index.save(out, file_sha256(src))
+    print(f"wrote {out} ({len(index.centroids)} buckets over {len(store)} models)")
+    for row in recall_report(index, sample_queries(store)):
+        print(f"n_probe={row['n_probe']:>3}  recall@5={row['recall']:.3f}  scanned={row['scanned']:.0%}")
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ARTIFACT_VERSION = 1
+
+
+class ModelVectorStore:
+    """
+    Business model embeddings held as one contiguous float32 matrix.
+    Rows are L2-normalised so cosine similarity is a single mat-vec product.
+    ids[i] is the business model ID for matrix row i.
+    """
+
+    def __init__(self, ids, matrix, normalised=False):
+        if not normalised:
+            matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            matrix = matrix / norms
+
+        self.ids = np.asarray(ids)
+        self.matrix = matrix
+        self.index = {bm: i for i, bm in enumerate(self.ids.tolist())}
+
+    @classmethod
+    def from_dict(cls, model_vectors):
+        """Build from the {bm_id: [floats]} layout of bm_model_vectors.json."""
+        ids = list(model_vectors.keys())
+        matrix = np.array([model_vectors[bm] for bm in ids], dtype=np.float32)
+        return cls(ids, matrix)
+
+    @classmethod
+    def from_json(cls, path="data/bm_model_vectors.json"):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    @classmethod
+    def from_artifact(cls, path):
+        """Memory-map a compiled artifact read-only (see compile_vectors)."""
+        npy_path, idx_path = artifact_paths(path)
+        with open(idx_path) as f:
+            meta = json.load(f)
+        matrix = np.load(npy_path, mmap_mode="r")
+        return cls(meta["ids"], matrix, normalised=True)
+
+    @classmethod
+    def load(cls, path="data/bm_model_vectors.json"):
+        """
+        Prefer the compiled artifact next to the JSON source; fall back to
+        parsing the JSON when the artifact is missing or stale.
+        """
+        if artifact_is_fresh(path):
+            return cls.from_artifact(path)
+        return cls.from_json(path)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def keys(self):
+        return self.ids.tolist()
+
+    def similarities(self, user_vec):
+        """Cosine similarity of one user vector against every model row."""
+        user_vec = np.asarray(user_vec, dtype=np.float32).ravel()
+        norm = np.linalg.norm(user_vec)
+        if norm == 0:
+            return np.zeros(len(self.ids), dtype=np.float32)
+        return self.matrix @ (user_vec / norm)
+
+    def similarities_batch(self, user_matrix):
+        """Cosine similarities for an (N, dim) block of user vectors -> (N, models)."""
+        user_matrix = np.asarray(user_matrix, dtype=np.float32)
+        norms = np.linalg.norm(user_matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (user_matrix / norms) @ self.matrix.T
+
+    def top_k(self, user_vec, k=5):
+        """
+        Best k models for one user vector, best first.
+        Uses partial selection, so cost is O(models) rather than a full sort.
+        Returns (ids, similarities).
+        """
+        sims = self.similarities(user_vec)
+        rows = top_k_rows(sims, k)
+        return self.ids[rows], sims[rows]
+
+    def to_dict(self, values):
+        """Map a per-row array back onto {bm_id: value}."""
+        return dict(zip(self.ids.tolist(), values.tolist()))
+
+
+def top_k_rows(scores, k):
+    """Row indices of the k highest scores, best first (argpartition + small sort)."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    rows = np.argpartition(-scores, k - 1)[:k]
+    return rows[np.argsort(-scores[rows], kind="stable")]
+
+
+# ============================================================
+# ---------- BINARY ARTIFACT ----------
+# ============================================================
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def artifact_paths(path):
+    """data/x.json -> (data/x.npy, data/x.ids.json)"""
+    p = Path(path)
+    return p.with_suffix(".npy"), p.with_suffix(".ids.json")
+
+
+def artifact_is_fresh(path):
+    npy_path, idx_path = artifact_paths(path)
+    if not (npy_path.exists() and idx_path.exists() and Path(path).exists()):
+        return False
+    try:
+        with open(idx_path) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return (
+        meta.get("version") == ARTIFACT_VERSION
+        and meta.get("source_sha256") == file_sha256(path)
+    )
+
+
+def write_artifact(path, ids, matrix, source_sha256, **extra):
+    """
+    Write a normalised float32 matrix as .npy plus an .ids.json index
+    carrying the row IDs and the source content hash.
+    """
+    npy_path, idx_path = artifact_paths(path)
+    store = ModelVectorStore(ids, matrix)
+    np.save(npy_path, store.matrix)
+
+    meta = {
+        "version": ARTIFACT_VERSION,
+        "source_sha256": source_sha256,
+        "shape": list(store.matrix.shape),
+        "dtype": "float32",
+        "ids": store.keys(),
+    }
+    meta.update(extra)
+    with open(idx_path, "w") as f:
+        json.dump(meta, f)
+    return npy_path, idx_path
+
+
+def compile_vectors(path="data/bm_model_vectors.json"):
+    """Compile bm_model_vectors.json into its memory-mappable artifact."""
+    with open(path) as f:
+        vectors = json.load(f)
+    ids = list(vectors.keys())
+    matrix = np.array([vectors[bm] for bm in ids], dtype=np.float32)
+    return write_artifact(path, ids, matrix, file_sha256(path))
+
+
+if __name__ == "__main__":
+    for src in sys.argv[1:] or ["data/bm_model_vectors.json"]:
+        for out in compile_vectors(src):
+            print(f"wrote {out}")
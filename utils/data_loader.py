@@ -1,21 +1,32 @@
-import json
 from pathlib import Path
 
+from utils.data_registry import get_asset
+from utils.tag_registry import tag_ids
+
 BASE_DIR = Path(__file__).resolve().parent.parent  # points to innovation_mentor/
 
-def load_json(relative_path: str):
-    full_path = BASE_DIR / relative_path
-    with open(full_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+def load_json(relative_path: str, transform=None):
+    """Cached, read-only view of a JSON asset (see utils/data_registry.py)."""
+    return get_asset(BASE_DIR / relative_path, transform)
+
+def _with_tag_ids(models):
+    for m in models:
+        m["tag_ids"] = tag_ids(m.get("tags", []))
+    return models
+
+def _with_core_tag_ids(archetypes):
+    for a in archetypes:
+        a["core_tag_ids"] = tag_ids(a.get("core_tags", []))
+    return archetypes
 
 def load_business_models():
-    return load_json("data/business_models.json")
+    return load_json("data/business_models.json", _with_tag_ids)
 
 def load_archetype_questions():
     return load_json("data/archetype_questions.json")
 
 def load_archetypes():
-    return load_json("data/archetypes.json")
+    return load_json("data/archetypes.json", _with_core_tag_ids)
 
 def load_secondary_questions():
     return load_json("data/secondary_questions.json")
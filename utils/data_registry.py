@@ -0,0 +1,169 @@
+"""
+Process-wide cache for the JSON assets under data/.
+
+Every page and utils loader goes through get_asset(), so each file is parsed
+once per process and handed out as a read-only view (dicts become
+MappingProxyType, lists become tuples). Entries are revalidated at most once
+per CHECK_INTERVAL seconds: an unchanged mtime/size is a hit without reading
+the file, a changed one is re-hashed and only re-parsed if the content
+actually changed. Use thaw() for a private mutable copy.
+
+On the first miss the registry is seeded from data/app_bundle.bin (see
+utils/data_bundle.py) when that bundle exists and matches its sources.
+"""
+import hashlib
+import json
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+CHECK_INTERVAL = 1.0
+
+
+def freeze(obj):
+    """Recursively wrap parsed JSON in read-only containers."""
+    if isinstance(obj, dict):
+        return MappingProxyType({k: freeze(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return tuple(freeze(v) for v in obj)
+    if isinstance(obj, np.ndarray):
+        obj.setflags(write=False)
+    return obj
+
+
+def thaw(obj):
+    """Mutable deep copy of a frozen view."""
+    if isinstance(obj, MappingProxyType) or isinstance(obj, dict):
+        return {k: thaw(v) for k, v in obj.items()}
+    if isinstance(obj, (tuple, list)):
+        return [thaw(v) for v in obj]
+    if isinstance(obj, np.ndarray):
+        return obj.copy()
+    return obj
+
+
+@lru_cache(maxsize=256)
+def resolve(path):
+    """Relative paths resolve against the working directory, then the app root."""
+    p = Path(path)
+    if p.is_absolute() or p.exists():
+        return p.resolve()
+    return (BASE_DIR / p).resolve()
+
+
+class _Entry:
+    __slots__ = ("stat_key", "digest", "value", "checked_at")
+
+
+class DataRegistry:
+    def __init__(self, check_interval=CHECK_INTERVAL, use_bundle=False):
+        self.check_interval = check_interval
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.use_bundle = use_bundle
+        self._bundle_tried = False
+
+    def _try_bundle(self):
+        self._bundle_tried = True
+        from utils.data_bundle import load_bundle
+
+        load_bundle(self)
+
+    def seed(self, path, transform, value, stat_key, digest):
+        """Install a precomputed value as if get(path, transform) had parsed it."""
+        key = (resolve(path), transform)
+        with self._lock:
+            if key in self._entries:
+                return
+            entry = self._entries[key] = _Entry()
+            entry.stat_key, entry.digest, entry.value = stat_key, digest, freeze(value)
+            entry.checked_at = time.monotonic()
+
+    def get(self, path, transform=None):
+        """
+        Parsed (and optionally transformed) content of a JSON file, frozen.
+        transform(data) receives a fresh mutable parse and its result is
+        cached alongside the file under the same invalidation.
+        """
+        if self.use_bundle and not self._bundle_tried:
+            self._try_bundle()
+
+        full = resolve(path)
+        key = (full, transform)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry.checked_at < self.check_interval:
+                self.hits += 1
+                return entry.value
+
+            st = full.stat()
+            stat_key = (st.st_mtime_ns, st.st_size)
+            if entry is not None and entry.stat_key == stat_key:
+                entry.checked_at = now
+                self.hits += 1
+                return entry.value
+
+            raw = full.read_bytes()
+            digest = hashlib.sha256(raw).hexdigest()
+            if entry is not None and entry.digest == digest:
+                entry.stat_key, entry.checked_at = stat_key, now
+                self.hits += 1
+                return entry.value
+
+            data = json.loads(raw)
+            value = freeze(transform(data) if transform else data)
+
+            if entry is None:
+                entry = self._entries[key] = _Entry()
+                self.misses += 1
+            else:
+                self.reloads += 1
+            entry.stat_key, entry.digest, entry.value, entry.checked_at = stat_key, digest, value, now
+            return value
+
+    def digest(self, path, transform=None):
+        """Content hash of the version currently cached for path."""
+        self.get(path, transform)
+        return self._entries[(resolve(path), transform)].digest
+
+    def invalidate(self, path=None):
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                full = resolve(path)
+                for key in [k for k in self._entries if k[0] == full]:
+                    del self._entries[key]
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "reloads": self.reloads,
+            "entries": len(self._entries),
+        }
+
+
+REGISTRY = DataRegistry(use_bundle=True)
+
+
+def get_asset(path, transform=None):
+    return REGISTRY.get(path, transform)
+
+
+def asset_digest(path, transform=None):
+    return REGISTRY.digest(path, transform)
+
+
+def registry_stats():
+    return REGISTRY.stats()
@@ -1,27 +1,124 @@
 
-from typing import List
+from typing import List, Tuple
+
+import numpy as np
+
+# irr_batch status flags
+IRR_OK = 0
+IRR_NONE = 1          # no sign change of NPV in the search range
+IRR_MULTIPLE = 2      # more than one IRR in range; the lowest is returned
+IRR_NOT_CONVERGED = 3
 
 def npv(rate: float, cashflows: List[float]) -> float:
     return sum(cf / ((1 + rate) ** t) for t, cf in enumerate(cashflows))
 
-def irr(cashflows: List[float], guess: float = 0.1, tol: float = 1e-6, max_iter: int = 100) -> float:
-    rate = guess
+def irr(cashflows: List[float], tol: float = 1e-6, max_iter: int = 100) -> float:
+    """IRR of one cashflow row (t = 0, 1, ...); nan if there is none (see irr_batch)."""
+    rates, _ = irr_batch([cashflows], tol=tol, max_iter=max_iter)
+    return float(rates[0])
+
+def _horner(flows: np.ndarray, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """P(x) = sum cf_t x**t and P'(x) per row, x being the discount factor 1 / (1 + r)."""
+    p = flows[:, -1].copy()
+    dp = np.zeros_like(p)
+    for t in range(flows.shape[1] - 2, -1, -1):
+        dp = dp * x + p
+        p = p * x + flows[:, t]
+    return p, dp
+
+def irr_batch(
+    cashflows,
+    lo: float = -0.99,
+    hi: float = 5.0,
+    tol: float = 1e-9,
+    max_iter: int = 100,
+    grid: int = 256,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    IRRs of an (N, years) array of cashflow rows, t = 0 first, searched in [lo, hi].
+    Returns (rates, flags): rates are nan where flags is IRR_NONE.
+
+    NPV is evaluated as a polynomial in x = 1 / (1 + r) by Horner's rule.
+    Each row keeps a sign-changing bracket; a Newton step is taken when it
+    stays inside the bracket, otherwise the bracket is bisected. Rows whose
+    cashflows change sign more than once (Descartes' rule) are scanned on a
+    log-spaced grid in x first to find every bracket in range; roots closer
+    together than the grid spacing can be reported as one.
+    """
+    flows = np.atleast_2d(np.asarray(cashflows, dtype=float))
+    n = flows.shape[0]
+    rates = np.full(n, np.nan)
+    flags = np.full(n, IRR_NONE, dtype=np.int8)
+    if flows.shape[1] < 2:
+        return rates, flags
+
+    # Bracket in x: r = hi -> x_lo, r = lo -> x_hi
+    a = np.full(n, 1.0 / (1.0 + hi))
+    b = np.full(n, 1.0 / (1.0 + lo))
+    pa, _ = _horner(flows, a)
+    pb, _ = _horner(flows, b)
+
+    signs = np.sign(flows)
+    changes = np.zeros(n, dtype=np.int64)
+    prev = np.zeros(n)
+    for t in range(flows.shape[1]):
+        s = signs[:, t]
+        changes += (s != 0) & (prev != 0) & (s != prev)
+        prev = np.where(s != 0, s, prev)
+
+    has_root = (changes > 0) & ((pa == 0) | (pb == 0) | (np.sign(pa) != np.sign(pb)))
+    ambiguous = np.flatnonzero(changes > 1)
+    if len(ambiguous):
+        # Scan from high rate (small x) to low rate; keep the highest-x (lowest-rate) bracket
+        xs = np.geomspace(a[0], b[0], grid + 1)
+        sub = flows[ambiguous]
+        vals = np.stack([_horner(sub, np.full(len(sub), x))[0] for x in xs], axis=1)
+        sv = np.sign(vals)
+        crossing = (sv[:, :-1] * sv[:, 1:] < 0) | (sv[:, 1:] == 0)
+        count = crossing.sum(axis=1)
+        found = count > 0
+        last = grid - 1 - np.argmax(crossing[:, ::-1], axis=1)
+        rows = ambiguous[found]
+        a[rows], b[rows] = xs[last[found]], xs[last[found] + 1]
+        pa[rows], pb[rows] = vals[found, last[found]], vals[found, last[found] + 1]
+        has_root[ambiguous] = found
+        flags[ambiguous[count > 1]] = IRR_MULTIPLE
+
+    scale = np.abs(flows).sum(axis=1)
+    active = np.flatnonzero(has_root)
+    x = np.where(np.abs(pa) < np.abs(pb), a, b)
+
     for _ in range(max_iter):
-        npv_val = 0.0
-        d_npv = 0.0
-        for t, cf in enumerate(cashflows):
-            denom = (1 + rate) ** t
-            npv_val += cf / denom
-            if t > 0:
-                d_npv += -t * cf / ((1 + rate) ** (t + 1))
-        if abs(npv_val) < tol:
-            return rate
-        if d_npv == 0:
+        if not len(active):
             break
-        rate -= npv_val / d_npv
-        if rate <= -0.9999:
-            rate = -0.99
-    return rate
+        fa, fb, xa = pa[active], pb[active], x[active]
+        lo_x, hi_x = a[active], b[active]
+        p, dp = _horner(flows[active], xa)
+
+        done = (np.abs(p) <= tol * scale[active]) | (hi_x - lo_x <= 1e-15 * np.maximum(1.0, hi_x))
+        # Shrink the bracket around the current point
+        left = np.sign(p) == np.sign(fa)
+        lo_x = np.where(left, xa, lo_x)
+        fa = np.where(left, p, fa)
+        hi_x = np.where(left, hi_x, xa)
+        fb = np.where(left, fb, p)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = xa - p / dp
+        inside = np.isfinite(newton) & (newton > lo_x) & (newton < hi_x)
+        x_next = np.where(inside, newton, 0.5 * (lo_x + hi_x))
+
+        a[active], b[active], pa[active], pb[active] = lo_x, hi_x, fa, fb
+        x[active] = np.where(done, xa, x_next)
+        finished = active[done]
+        rates[finished] = 1.0 / x[finished] - 1.0
+        flags[finished] = np.where(flags[finished] == IRR_MULTIPLE, IRR_MULTIPLE, IRR_OK)
+        active = active[~done]
+
+    if len(active):
+        rates[active] = 1.0 / x[active] - 1.0
+        flags[active] = IRR_NOT_CONVERGED
+    return rates, flags
 
 def payback_period(cashflows: List[float]) -> float:
     cum = 0.0
@@ -1,7 +1,14 @@
 from __future__ import annotations
-import json, os
+import os
 from collections import Counter
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Mapping, Sequence, Tuple, Any
+
+import numpy as np
+
+from utils.data_registry import asset_digest, get_asset
+from utils.tag_registry import (
+    UNKNOWN_TAG, load_registry, overlap_counts, registered_ids, shared, tag_id, tag_ids,
+)
 
 
 # ============================================================
@@ -13,17 +20,22 @@ def _data_path() -> str:
     return os.path.join(here, "data", "business_models.json")
 
 
-def load_models() -> List[Dict[str, Any]]:
-    """Load models and attach auto-cluster categories."""
-    path = _data_path()
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+def load_models() -> Sequence[Mapping[str, Any]]:
+    """
+    Load models (cached, read-only) with auto-cluster categories attached.
+    The result is a tuple of mapping proxies shared by every caller;
+    data_registry.thaw() gives a mutable copy.
+    """
+    return get_asset(_data_path(), _prepare_models)
+
 
+def _prepare_models(data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     out = []
     for m in data:
         m.setdefault("tags", [])
         m.setdefault("description", "")
         m.setdefault("id", m.get("name", ""))
+        m["tag_ids"] = tag_ids(m["tags"])
 
         # Auto Cluster / Category (A)
         m["cluster"] = auto_cluster(m)
@@ -37,27 +49,23 @@ def load_models() -> List[Dict[str, Any]]:
 # ---------- AUTO-CLUSTERING (A)
 # ============================================================
 
+CLUSTER_RULES: List[Tuple[set, str]] = [
+    ({"software", "cloud", "digital", "AI"}, "Digital / Software"),
+    ({"manufacturing", "hardware", "IoT"}, "Hardware & Manufacturing"),
+    ({"impact", "green", "sustainability", "carbon"}, "Impact / Green Economy"),
+    ({"finance", "royalties", "BOOT", "impact_finance"}, "Finance & Hybrid Models"),
+    ({"platform", "community", "ecosystem"}, "Platforms / Ecosystems"),
+    ({"services", "aftermarket", "servitization"}, "Service & Operations"),
+]
+
+
 def auto_cluster(model: Dict[str, Any]) -> str:
     """Assign cluster automatically based on tags."""
     tags = set(model.get("tags", []))
 
-    if {"software", "cloud", "digital", "AI"} & tags:
-        return "Digital / Software"
-
-    if {"manufacturing", "hardware", "IoT"} & tags:
-        return "Hardware & Manufacturing"
-
-    if {"impact", "green", "sustainability", "carbon"} & tags:
-        return "Impact / Green Economy"
-
-    if {"finance", "royalties", "BOOT", "impact_finance"} & tags:
-        return "Finance & Hybrid Models"
-
-    if {"platform", "community", "ecosystem"} & tags:
-        return "Platforms / Ecosystems"
-
-    if {"services", "aftermarket", "servitization"} & tags:
-        return "Service & Operations"
+    for cluster_tags, label in CLUSTER_RULES:
+        if cluster_tags & tags:
+            return label
 
     return "General / Other"
 
@@ -79,22 +87,76 @@ QUESTION_BANK: List[Dict[str, Any]] = [
 # ---------- TAG ACCUMULATION ----------
 # ============================================================
 
+class CompiledQuestions:
+    """
+    QUESTION_BANK with every option's tag weights as a sparse vector over
+    tag_registry ids: options[(question id, choice)] = (ids, weights, tags).
+    Unregistered tags keep UNKNOWN_TAG and are looked up by name per index.
+    """
+
+    def __init__(self, bank: List[Dict[str, Any]]):
+        self.by_id = {q["id"]: q for q in bank}
+        self.options: Dict[Tuple[Any, str], Tuple[np.ndarray, np.ndarray, List[str]]] = {}
+        for q in bank:
+            for choice, weight_map in q["options"].items():
+                self.options[(q["id"], choice)] = (
+                    np.array([tag_id(t) for t in weight_map], dtype=np.int64),
+                    np.array(list(weight_map.values()), dtype=np.float64),
+                    list(weight_map),
+                )
+
+    def tally(self, selections: Dict[str, str]) -> Counter:
+        tally = Counter()
+        for qid, choice in selections.items():
+            q = self.by_id.get(qid)
+            if not q:
+                continue
+            tally.update(q["options"].get(choice, {}))
+        return tally
+
+    def vector(self, selections: Dict[str, str], index: "TagIndex") -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (summed weights, tag mentioned by any chosen option, bits in the
+        order accumulate_tags' Counter first meets them) over the index's tag bits.
+        """
+        n_tags = index.n_tags
+        parts = [self.options[key] for key in selections.items() if key in self.options]
+        if not parts:
+            return np.zeros(n_tags), np.zeros(n_tags, dtype=bool), np.zeros(0, dtype=np.int64)
+        ids = np.concatenate([p[0] for p in parts])
+        weights = np.concatenate([p[1] for p in parts])
+        unknown = np.flatnonzero(ids == UNKNOWN_TAG)
+        if len(unknown):
+            names = [t for p in parts for t in p[2]]
+            ids[unknown] = [index.vocab.get(names[i], n_tags) for i in unknown]
+        keep = ids < n_tags
+        w = np.bincount(ids[keep], weights=weights[keep], minlength=n_tags)
+        present = np.bincount(ids[keep], minlength=n_tags) > 0
+        bits, first = np.unique(ids[keep], return_index=True)
+        return w, present, bits[np.argsort(first)]
+
+
+_COMPILED_QUESTIONS: List[Tuple[Any, CompiledQuestions]] = []
+
+
+def compiled_questions(bank: List[Dict[str, Any]] | None = None) -> CompiledQuestions:
+    """CompiledQuestions for a question bank (QUESTION_BANK by default), reused per bank object."""
+    bank = QUESTION_BANK if bank is None else bank
+    for cached_bank, compiled in _COMPILED_QUESTIONS:
+        if cached_bank is bank:
+            return compiled
+    compiled = CompiledQuestions(bank)
+    _COMPILED_QUESTIONS.insert(0, (bank, compiled))
+    del _COMPILED_QUESTIONS[4:]
+    return compiled
+
+
 def accumulate_tags(selections: Dict[str, str]) -> Counter:
     """
     selections: {question_id: chosen_option_label}
     returns: Counter of tag weights
     """
-    tally = Counter()
-    by_id = {q["id"]: q for q in QUESTION_BANK}
-
-    for qid, choice in selections.items():
-        q = by_id.get(qid)
-        if not q:
-            continue
-        weight_map = q["options"].get(choice, {})
-        tally.update(weight_map)
-
-    return tally
+    return compiled_questions().tally(selections)
 
 
 
@@ -102,29 +164,50 @@ def accumulate_tags(selections: Dict[str, str]) -> Counter:
 # ---------- TRL GATE ADJUSTMENTS (your original logic) ----------
 # ============================================================
 
+TRL_GATE_PENALISED = ["high_capex", "infrastructure", "BOOT"]  # TRL <= 4
+TRL_GATE_BOOSTED = {
+    "early": ["IP", "services", "early_stage", "open_source"],                          # TRL <= 4
+    "mid": ["distribution", "servitization", "aftermarket", "scalable"],               # TRL 5–6
+    "late": ["infrastructure", "servitization", "managed", "growth", "transaction"],   # TRL 7–9
+}
+
+
+def _gate_adjustments(trl_level: int) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """(unconditional deltas, deltas applied only to tags already weighted) for a TRL."""
+    if trl_level <= 4:
+        return {t: 1 for t in TRL_GATE_BOOSTED["early"]}, {t: -2 for t in TRL_GATE_PENALISED}
+    if 5 <= trl_level <= 6:
+        return {t: 1 for t in TRL_GATE_BOOSTED["mid"]}, {}
+    return {t: 1 for t in TRL_GATE_BOOSTED["late"]}, {}
+
+
+TRL_LEVELS = range(0, 10)
+# Precomputed per TRL; levels outside 0-9 fall in the same bands
+TRL_GATE_ADJUSTMENTS = {trl: _gate_adjustments(trl) for trl in TRL_LEVELS}
+
+
+def trl_row(trl_level) -> int | None:
+    """Row of the per-TRL tables for a TRL (5 and 5.0 alike), or None when it has none."""
+    return int(trl_level) if trl_level in TRL_LEVELS else None
+
+
 def trl_gate_score_adjustments(tag_weights: Counter, trl_level: int | None) -> Counter:
     """Adjust tag weights based on TRL to steer recommendations sensibly."""
     if trl_level is None:
         return tag_weights
 
+    boosts, penalties = TRL_GATE_ADJUSTMENTS.get(trl_level) or _gate_adjustments(trl_level)
     adj = tag_weights.copy()
+    for t, d in penalties.items():
+        if t in adj:
+            adj[t] += d
+    for t, d in boosts.items():
+        adj[t] += d
 
-    if trl_level <= 4:
-        for t in ["high_capex", "infrastructure", "BOOT"]:
-            if t in adj:
-                adj[t] -= 2
-        for t in ["IP", "services", "early_stage", "open_source"]:
-            adj[t] += 1
+    return adj
 
-    elif 5 <= trl_level <= 6:
-        for t in ["distribution", "servitization", "aftermarket", "scalable"]:
-            adj[t] += 1
 
-    else:  # 7–9
-        for t in ["infrastructure", "servitization", "managed", "growth", "transaction"]:
-            adj[t] += 1
 
-    return adj
 
 
 
@@ -132,34 +215,221 @@ def trl_gate_score_adjustments(tag_weights: Counter, trl_level: int | None) -> C
 # ---------- MODEL SCORING (yours) ----------
 # ============================================================
 
+class TagIndex:
+    """
+    Model catalogue compiled for tag scoring.
+    vocab:    {tag: bit}, bits being the shared tag_registry ids; tags
+              missing from the registry get bits after it, local to the index
+    bits[i]:  integer bitset of model i's tags
+    inverted: {tag: [model rows carrying it]}
+    indptr / rows: sparse tag x model incidence (CSR over tag ids)
+    sizes[i]: number of distinct tags on model i
+    """
+
+    def __init__(self, models: List[Dict[str, Any]]):
+        self.models = models
+        self.vocab: Dict[str, int] = {}
+        self.bits: List[int] = []
+        self.inverted: Dict[str, List[int]] = {}
+        self.row_of: Dict[int, int] = {}
+        self.trl_tables: TRLTables | None = None
+        overflow = len(load_registry())
+
+        for row, m in enumerate(models):
+            b = 0
+            for t in set(m.get("tags", [])):
+                bit = self.vocab.get(t)
+                if bit is None:
+                    bit = tag_id(t)
+                    if bit == UNKNOWN_TAG:
+                        bit, overflow = overflow, overflow + 1
+                    self.vocab[t] = bit
+                b |= 1 << bit
+                self.inverted.setdefault(t, []).append(row)
+            self.bits.append(b)
+            self.row_of[id(m)] = row
+        self.sizes = np.array([len(set(m.get("tags", []))) for m in models], dtype=np.int64)
+
+        self.n_tags = max(self.vocab.values(), default=-1) + 1
+        counts = np.zeros(self.n_tags, dtype=np.int64)
+        for t, rows in self.inverted.items():
+            counts[self.vocab[t]] = len(rows)
+        self.indptr = np.concatenate([[0], np.cumsum(counts)])
+        self.rows = np.zeros(self.indptr[-1], dtype=np.int64)
+        for t, rows in self.inverted.items():
+            start = self.indptr[self.vocab[t]]
+            self.rows[start:start + len(rows)] = rows
+        self.entry_tags = np.repeat(np.arange(self.n_tags), counts)
+
+    def weight_vector(self, tag_weights: Dict[str, float]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (weights, tag present in tag_weights, bits in tag_weights order) over
+        tag ids; tags no model carries are dropped.
+        """
+        w = np.zeros(self.n_tags)
+        present = np.zeros(self.n_tags, dtype=bool)
+        order = []
+        for t, weight in tag_weights.items():
+            bit = self.vocab.get(t)
+            if bit is not None:
+                w[bit] += weight
+                present[bit] = True
+                order.append(bit)
+        return w, present, np.array(order, dtype=np.int64)
+
+    def scores(self, w: np.ndarray, order: np.ndarray | None = None) -> np.ndarray:
+        """
+        Per-model sum of the weights of its tags (incidence^T @ w), read from
+        the inverted lists of the weighted tags only; other models score 0.
+        As in score_models' scan, positive and negative weights are summed
+        separately, each in `order` (default: tag id order), then added, so
+        float weights round the same way.
+        """
+        bits = np.flatnonzero(w) if order is None else order[w[order] != 0]
+        total = np.zeros(len(self.models))
+        for part in (bits[w[bits] > 0], bits[w[bits] < 0]):
+            if len(part):
+                entries = np.concatenate([np.arange(self.indptr[b], self.indptr[b + 1]) for b in part])
+                total = total + np.bincount(
+                    self.rows[entries], weights=w[self.entry_tags[entries]], minlength=len(self.models)
+                )
+        return total
+
+    def overlap(self, tags) -> np.ndarray:
+        """Per-model count of the given tags it carries (one bincount over their postings)."""
+        bits = [self.vocab[t] for t in set(tags) if t in self.vocab]
+        if not bits:
+            return np.zeros(len(self.models), dtype=np.int64)
+        hits = np.concatenate([self.rows[self.indptr[b]:self.indptr[b + 1]] for b in bits])
+        return np.bincount(hits, minlength=len(self.models))
+
+    def has_tag(self, row: int, tag: str) -> bool:
+        bit = self.vocab.get(tag)
+        return bit is not None and bool(self.bits[row] >> bit & 1)
+
+
+# The catalogue views (one per loader transform) and their indexes; ad-hoc lists are never cached
+_TAG_INDEXES: List[Tuple[Any, TagIndex]] = []
+
+
+def _catalogue_views() -> Tuple[Any, ...]:
+    from utils.data_loader import load_business_models
+
+    return load_models(), load_business_models()
+
+
+def tag_index(models: List[Dict[str, Any]]) -> TagIndex:
+    """
+    TagIndex for a model list. The catalogue's index is built once and kept;
+    any other list gets a fresh, uncached index.
+    """
+    for cached_models, index in _TAG_INDEXES:
+        if cached_models is models:
+            return index
+    index = TagIndex(models)
+    if any(models is view for view in _catalogue_views()):
+        _TAG_INDEXES.insert(0, (models, index))
+        del _TAG_INDEXES[2:]
+    return index
+
+
+def _catalogue_rows(models: List[Dict[str, Any]] | TagIndex) -> Tuple[TagIndex | None, np.ndarray | None]:
+    """
+    (index, subset) for a model argument. The catalogue, or a list drawn
+    from it (e.g. a filtered catalogue), uses the cached catalogue index,
+    with `subset` holding the list's catalogue rows in list order (None for
+    the whole catalogue). Lists with other models give (None, None).
+    """
+    if isinstance(models, TagIndex):
+        return models, None
+    for catalogue in _catalogue_views():
+        if models is catalogue:
+            return tag_index(catalogue), None
+        if models and id(models[0]) in tag_index(catalogue).row_of:
+            row_of = tag_index(catalogue).row_of
+            rows = np.fromiter((row_of.get(id(m), -1) for m in models), dtype=np.intp, count=len(models))
+            if rows.min() >= 0:
+                return tag_index(catalogue), rows
+    return None, None
+
+
+def _resolve(models: List[Dict[str, Any]] | TagIndex) -> Tuple[TagIndex, np.ndarray | None]:
+    """_catalogue_rows, with an uncached index for lists outside the catalogue."""
+    index, subset = _catalogue_rows(models)
+    if index is None:
+        return TagIndex(models), None
+    return index, subset
+
+
+def tag_overlap(models: List[Dict[str, Any]], *tag_groups) -> np.ndarray:
+    """
+    (groups, models) counts of each group's tags carried by each model. The
+    catalogue (or a list drawn from it) reads the cached index's postings;
+    other lists go through their tag id arrays.
+    """
+    index, subset = _catalogue_rows(models)
+    if index is None:
+        return np.array([overlap_counts(models, tags) for tags in tag_groups]).reshape(len(tag_groups), len(models))
+    counts = np.array([index.overlap(tags) for tags in tag_groups]).reshape(len(tag_groups), len(index.models))
+    return counts if subset is None else counts[:, subset]
+
+
+def _score_models_scan(tag_weights: Counter, models: List[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
+    """The original full scan, for lists that are not catalogue models."""
+    results = []
+    for m in models:
+        mtags = set(m.get("tags", []))
+        overlap = {t: w for t, w in tag_weights.items() if t in mtags and w > 0}
+        penalty_overlap = {t: w for t, w in tag_weights.items() if t in mtags and w < 0}
+        score = sum(overlap.values()) + sum(penalty_overlap.values())
+        results.append({
+            "model": m,
+            "score": score,
+            "matched": dict(sorted(overlap.items(), key=lambda x: -x[1])),
+            "penalties": dict(sorted(penalty_overlap.items(), key=lambda x: x[1]))
+        })
+    results.sort(key=lambda x: x["score"], reverse=True)
+    return results[:top_k]
+
+
 def score_models(
     tag_weights: Counter,
-    models: List[Dict[str, Any]],
+    models: List[Dict[str, Any]] | TagIndex,
     top_k: int = 3
 ) -> List[Dict[str, Any]]:
-    """Score by summing weights of overlapping tags."""
+    """
+    Score by summing weights of overlapping tags.
+    One product with the tag x model incidence matrix; ties keep list
+    order, as the full sort did. Lists of non-catalogue models are scanned.
+    """
+    index, subset = _catalogue_rows(models)
+    if index is None:
+        return _score_models_scan(tag_weights, models, top_k)
+    w, present, order = index.weight_vector(tag_weights)
+    rows, scores = _rank_rows(index, w, present, order, None, top_k, subset=subset)
+    if subset is not None:
+        rows = subset[rows]
+    integral = all(isinstance(v, int) for v in tag_weights.values())
+    return _explain(index, tag_weights, rows, [int(s) if integral else s for s in scores.tolist()])
+
+
+def _explain(index: TagIndex, tag_weights: Counter, rows, scores) -> List[Dict[str, Any]]:
     results: List[Dict[str, Any]] = []
-
-    for m in models:
-        mtags = set(m.get("tags", []))
-
+    for row, score in zip(rows, scores):
         overlap = {t: w for t, w in tag_weights.items()
-                   if t in mtags and w > 0}
+                   if w > 0 and index.has_tag(row, t)}
 
         penalty_overlap = {t: w for t, w in tag_weights.items()
-                           if t in mtags and w < 0}
-
-        score = sum(overlap.values()) + sum(penalty_overlap.values())
+                           if w < 0 and index.has_tag(row, t)}
 
         results.append({
-            "model": m,
+            "model": index.models[row],
             "score": score,
             "matched": dict(sorted(overlap.items(), key=lambda x: -x[1])),
             "penalties": dict(sorted(penalty_overlap.items(), key=lambda x: x[1]))
         })
 
-    results.sort(key=lambda x: x["score"], reverse=True)
-    return results[:top_k]
+    return results
 
 
 
@@ -168,7 +438,13 @@ def score_models(
 # ============================================================
 
 def model_similarity(m1: Dict[str, Any], m2: Dict[str, Any]) -> float:
-    """Jaccard similarity of tag sets."""
+    """Jaccard similarity of tag sets (of the tag id arrays when both are registered)."""
+    a, b = registered_ids(m1), registered_ids(m2)
+    if a is not None and b is not None:
+        if not len(a) or not len(b):
+            return 0.0
+        inter = len(shared(a, b))
+        return inter / (len(a) + len(b) - inter)
     t1 = set(m1.get("tags", []))
     t2 = set(m2.get("tags", []))
     if not t1 or not t2:
@@ -176,19 +452,143 @@ def model_similarity(m1: Dict[str, Any], m2: Dict[str, Any]) -> float:
     return len(t1 & t2) / len(t1 | t2)
 
 
+_SIMILARITY: Dict[str, Tuple[Any, List[str], np.ndarray]] = {}
+
+
+def _vectors_path() -> str:
+    return os.path.join(os.path.dirname(_data_path()), "bm_model_vectors.json")
+
+
+def compute_similarity_matrix(models: List[Dict[str, Any]], metric: str = "jaccard") -> np.ndarray:
+    """
+    All pairwise model similarities.
+    "jaccard": tag sets as a model x tag bit matrix; |A & B| / |A | B|.
+    "cosine":  cosine of the model embeddings in bm_model_vectors.json.
+    """
+    if metric == "jaccard":
+        arrays = [registered_ids(m) for m in models]
+        if all(ids is not None for ids in arrays):
+            # Columns are the registry ids in use, renumbered densely
+            flat = np.concatenate([np.asarray(ids, dtype=np.int64) for ids in arrays] or [np.zeros(0, np.int64)])
+            cols, dense = np.unique(flat, return_inverse=True)
+            bits = np.zeros((len(models), len(cols)), dtype=np.int32)
+            bits[np.repeat(np.arange(len(models)), [len(ids) for ids in arrays]), dense] = 1
+        else:
+            vocab = {t: i for i, t in enumerate(sorted({t for m in models for t in m.get("tags", [])}))}
+            bits = np.zeros((len(models), len(vocab)), dtype=np.int32)
+            for r, m in enumerate(models):
+                bits[r, [vocab[t] for t in set(m.get("tags", []))]] = 1
+
+        inter = bits @ bits.T
+        sizes = bits.sum(axis=1)
+        union = sizes[:, None] + sizes[None, :] - inter
+        sim = np.divide(inter, union, out=np.zeros(inter.shape), where=union > 0)
+        empty = sizes == 0
+        sim[empty, :] = 0.0
+        sim[:, empty] = 0.0
+        return sim
+
+    if metric == "cosine":
+        from utils.bm_ai_engine import load_vector_store
+
+        store = load_vector_store(_vectors_path())
+        rows = [store.index.get(m["id"]) for m in models]
+        matrix = np.zeros((len(models), store.matrix.shape[1]), dtype=np.float32)
+        for r, row in enumerate(rows):
+            if row is not None:
+                matrix[r] = store.matrix[row]
+        return (matrix @ matrix.T).astype(np.float64)
+
+    raise ValueError(f"Unknown similarity metric: {metric}")
+
+
+def similarity_matrix(metric: str = "jaccard") -> Tuple[List[str], np.ndarray]:
+    """
+    (model ids, similarity matrix) for the catalogue in business_models.json.
+    Cached per process; rebuilt when the catalogue changes and, for
+    "cosine", when bm_model_vectors.json's mtime or size changes.
+    """
+    digest = asset_digest(_data_path(), _prepare_models)
+    if metric == "cosine":
+        st = os.stat(_vectors_path())
+        digest = (digest, st.st_mtime_ns, st.st_size)
+    cached = _SIMILARITY.get(metric)
+    if cached is None or cached[0] != digest:
+        models = load_models()
+        cached = (digest, [m["id"] for m in models], compute_similarity_matrix(models, metric))
+        _SIMILARITY[metric] = cached
+    return cached[1], cached[2]
+
+
+def similarity_row(
+    model: Dict[str, Any],
+    models: List[Dict[str, Any]],
+    metric: str = "jaccard"
+) -> np.ndarray:
+    """
+    Similarity of one model to each of `models`, without the pairwise matrix.
+    "jaccard" counts shared tags from the catalogue's inverted lists; models
+    that are not catalogue entries are compared tag set by tag set.
+    """
+    if metric == "jaccard":
+        tags = set(model.get("tags", []))
+        out = np.zeros(len(models))
+        if not tags:
+            return out
+        index = tag_index(load_models())
+        rows = np.array([index.row_of.get(id(m), -1) for m in models], dtype=np.int64)
+        known = rows >= 0
+        inter = np.zeros(len(models), dtype=np.int64)
+        sizes = np.zeros(len(models), dtype=np.int64)
+        inter[known] = index.overlap(tags)[rows[known]]
+        sizes[known] = index.sizes[rows[known]]
+        for c in np.flatnonzero(~known):
+            other = set(models[c].get("tags", []))
+            inter[c], sizes[c] = len(tags & other), len(other)
+        union = len(tags) + sizes - inter
+        np.divide(inter, union, out=out, where=sizes > 0)
+        return out
+
+    if metric == "cosine":
+        from utils.bm_ai_engine import load_vector_store
+
+        store = load_vector_store(_vectors_path())
+        out = np.zeros(len(models))
+        own = store.index.get(model["id"])
+        if own is None:
+            return out
+        rows = np.array([store.index.get(m["id"], -1) for m in models], dtype=np.int64)
+        known = rows >= 0
+        out[known] = np.asarray(store.matrix[rows[known]]) @ np.asarray(store.matrix[own])
+        return out
+
+    raise ValueError(f"Unknown similarity metric: {metric}")
+
+
 def find_adjacent_models(
     top_model: Dict[str, Any],
     all_models: List[Dict[str, Any]],
-    threshold: float = 0.35
+    threshold: float = 0.35,
+    metric: str = "jaccard"
 ) -> List[Dict[str, Any]]:
-    """Find similar models above the threshold."""
-    adj = []
-    for m in all_models:
-        if m["id"] == top_model["id"]:
-            continue
-        sim = model_similarity(top_model, m)
-        if sim >= threshold:
-            adj.append({"model": m, "similarity": round(sim, 2)})
+    """Find similar models above the threshold (one row of the cached similarity matrix)."""
+    catalogue = load_models()
+    if all_models is catalogue or (
+        len(all_models) == len(catalogue)
+        and [m["id"] for m in all_models] == [m["id"] for m in catalogue]
+    ):
+        ids, sim = similarity_matrix(metric)
+        row = sim[ids.index(top_model["id"])] if top_model["id"] in ids else None
+    else:
+        row = None
+    if row is None:
+        # Not the cached catalogue (e.g. a filtered list): one row only
+        row = similarity_row(top_model, all_models, metric)
+    adj = [
+        {"model": all_models[c], "similarity": round(float(row[c]), 2)}
+        for c in np.flatnonzero(row >= threshold)
+        if all_models[c]["id"] != top_model["id"]
+    ]
 
     return sorted(adj, key=lambda x: -x["similarity"])
 
@@ -198,27 +598,219 @@ def find_adjacent_models(
 # ---------- TRL SCORE CAPS (C)
 # ============================================================
 
+# (tags, minimum TRL): models carrying any of the tags are penalised below it
+TRL_CAP_RULES: List[Tuple[set, int]] = [
+    ({"high_capex"}, 5),
+    ({"manufacturing", "infrastructure"}, 4),
+    ({"finance", "hybrid", "impact_finance"}, 6),
+]
+
+
+def _cap_hits(tags: set, trl: int) -> int:
+    return sum(1 for cap_tags, min_trl in TRL_CAP_RULES if cap_tags & tags and trl < min_trl)
+
+
 def apply_trl_caps(
     scored_models: List[Dict[str, Any]],
     trl: int | None,
     penalty_factor=0.7
 ) -> List[Dict[str, Any]]:
-    """Downweight unsuitable business models for low TRL."""
+    """
+    Downweight unsuitable business models for low TRL.
+    Applies to whatever list it is given; rank_for_trl caps the whole
+    catalogue before top-k truncation instead.
+    """
     if trl is None:
         return scored_models
 
+    tables = trl_tables(tag_index(load_models()))
     for item in scored_models:
         m = item["model"]
-        tags = set(m.get("tags", []))
-
-        if "high_capex" in tags and trl < 5:
+        row = tables.rows.get(m.get("id"))
+        level = trl_row(trl)
+        if row is not None and tables.models[row] is m and level is not None:
+            hits = int(tables.cap_hits[level, row])
+        else:
+            hits = _cap_hits(set(m.get("tags", [])), trl)
+
+        for _ in range(hits):
             item["score"] = int(item["score"] * penalty_factor)
 
-        if {"manufacturing", "infrastructure"} & tags and trl < 4:
-            item["score"] = int(item["score"] * penalty_factor)
+    return scored_models
 
-        if {"finance", "hybrid", "impact_finance"} & tags and trl < 6:
-            item["score"] = int(item["score"] * penalty_factor)
 
-    return scored_models
 
+# ============================================================
+# ---------- PER-TRL TABLES (D)
+# ============================================================
+
+class TRLTables:
+    """
+    The TRL gate, gate adjustments and caps precomputed for each TRL 0-9,
+    every vector aligned to the model rows of a TagIndex.
+    eligible[trl]:    trl_min <= trl (scoring.trl_gate)
+    boost[trl]:       additive change to each tag's weight from the
+                      unconditional boosts; boost_bits[trl] their bits in order
+    conditional[trl]: additive change to a tag's weight when it is weighted
+    cap_hits[trl]:    number of TRL_CAP_RULES that penalise each model
+    The tag vectors run over the TagIndex bits and follow
+    trl_gate_score_adjustments step for step.
+    """
+
+    def __init__(self, models: List[Dict[str, Any]] | TagIndex):
+        self.index = models if isinstance(models, TagIndex) else tag_index(models)
+        self.models = self.index.models
+        self.rows = {m.get("id"): r for r, m in enumerate(self.models)}
+        n = len(self.models)
+
+        trl_min = np.array([m.get("trl_min", 1) for m in self.models])
+        levels = np.array(TRL_LEVELS)
+        self.eligible = trl_min[None, :] <= levels[:, None]
+
+        self.boost = np.zeros((len(levels), self.index.n_tags))
+        self.conditional = np.zeros((len(levels), self.index.n_tags))
+        self.boost_bits: List[np.ndarray] = []
+        for trl in TRL_LEVELS:
+            boosts, penalties = TRL_GATE_ADJUSTMENTS[trl]
+            self.boost[trl], bits = self.tag_vector(boosts)
+            self.boost_bits.append(bits)
+            self.conditional[trl] = self.tag_vector(penalties)[0]
+
+        tag_sets = [set(m.get("tags", [])) for m in self.models]
+        self.cap_hits = np.array([[_cap_hits(tags, trl) for tags in tag_sets] for trl in TRL_LEVELS],
+                                 dtype=np.int8).reshape(len(levels), n)
+
+    def tag_vector(self, deltas: Dict[str, float]) -> Tuple[np.ndarray, np.ndarray]:
+        """(deltas over the index's tag bits, their bits in order); tags no model carries are dropped."""
+        v = np.zeros(self.index.n_tags)
+        bits = [self.index.vocab[t] for t in deltas if t in self.index.vocab]
+        v[bits] = [deltas[t] for t in deltas if t in self.index.vocab]
+        return v, np.array(bits, dtype=np.int64)
+
+    def level(self, trl) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (boost, boost_bits, conditional, cap_hits, eligible) for any TRL: the
+        precomputed rows for 0-9, computed on the fly for other values (e.g. 4.5 or 12).
+        """
+        row = trl_row(trl)
+        if row is not None:
+            return (self.boost[row], self.boost_bits[row], self.conditional[row],
+                    self.cap_hits[row], self.eligible[row])
+        boosts, penalties = _gate_adjustments(trl)
+        return (
+            *self.tag_vector(boosts),
+            self.tag_vector(penalties)[0],
+            np.array([_cap_hits(set(m.get("tags", [])), trl) for m in self.models], dtype=np.int8),
+            np.array([m.get("trl_min", 1) <= trl for m in self.models], dtype=bool),
+        )
+
+    def penalty(self, trl: int, penalty_factor=0.7) -> np.ndarray:
+        """Multiplicative cap vector for a TRL (1.0 where no cap applies)."""
+        return penalty_factor ** self.level(trl)[3]
+
+
+def trl_tables(models: List[Dict[str, Any]] | TagIndex) -> TRLTables:
+    """TRLTables for a model list or TagIndex, kept on the index it was built for."""
+    index = models if isinstance(models, TagIndex) else tag_index(models)
+    if index.trl_tables is None:
+        index.trl_tables = TRLTables(index)
+    return index.trl_tables
+
+
+def _rank_rows(
+    index: TagIndex,
+    w: np.ndarray,
+    present: np.ndarray,
+    order: np.ndarray,
+    trl: int | None,
+    top_k: int,
+    penalty_factor=0.7,
+    subset: np.ndarray | None = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The compiled pipeline: tag weights -> TRL adjustments -> model scores ->
+    caps -> gate -> top k. Returns (positions best first, their scores).
+    Positions are index rows, or with subset (index rows in list order) the
+    positions in that list; only the subset competes and ties keep its order.
+    The arithmetic is the original chain's: adjustments change tag weights,
+    sums follow `order` (the tag_weights order), and each cap truncates
+    like apply_trl_caps' int().
+    """
+    candidates = np.arange(len(index.models)) if subset is None else subset
+    positions = np.arange(len(candidates))
+
+    if trl is None:
+        scores = index.scores(w, order)
+    else:
+        boost, boost_bits, conditional, cap_hits, eligible = trl_tables(index).level(trl)
+        w = w + conditional * present + boost
+        order = np.concatenate([order, boost_bits[~present[boost_bits]]])
+        scores = index.scores(w, order)
+        for hit in range(1, int(cap_hits.max(initial=0)) + 1):
+            capped = cap_hits >= hit
+            scores[capped] = np.trunc(scores[capped] * penalty_factor)
+        positions = np.flatnonzero(eligible[candidates])
+
+    best = _top_k_stable(positions, scores[candidates[positions]], top_k)
+    return best, scores[candidates[best]]
+
+
+def _top_k_stable(rows: np.ndarray, values: np.ndarray, k: int) -> np.ndarray:
+    """
+    The k rows with the highest values, best first, ties by row index (as a
+    stable full sort of ascending rows would give). argpartition finds the
+    k-th value; only rows at or above it are sorted.
+    """
+    if k <= 0 or not len(rows):
+        return rows[:0]
+    if k < len(rows):
+        kth = np.partition(values, len(values) - k)[len(values) - k]
+        keep = values >= kth
+        rows, values = rows[keep], values[keep]
+    return rows[np.lexsort((rows, -values))][:k]
+
+
+def rank_models(
+    selections: Dict[str, str],
+    trl: int | None = None,
+    models: List[Dict[str, Any]] | TagIndex | None = None,
+    top_k: int = 3,
+    penalty_factor=0.7,
+    bank: List[Dict[str, Any]] | None = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    accumulate_tags -> trl_gate_score_adjustments -> score_models -> caps as
+    array operations: question answers straight to (ranked model rows, scores).
+    """
+    if models is None:
+        models = load_models()
+    index, subset = _resolve(models)
+    w, present, order = compiled_questions(bank).vector(selections, index)
+    return _rank_rows(index, w, present, order, trl, top_k, penalty_factor, subset)
+
+
+def rank_for_trl(
+    tag_weights: Counter,
+    trl: int | None,
+    models: List[Dict[str, Any]] | TagIndex,
+    top_k: int = 3,
+    penalty_factor=0.7
+) -> List[Dict[str, Any]]:
+    """
+    score_models with the TRL gate, gate adjustments and caps applied to
+    every eligible model before the top-k cut. Scores are the capped
+    values; ties keep catalogue order.
+    """
+    if trl is None:
+        return score_models(tag_weights, models, top_k)
+
+    index, subset = _resolve(models)
+    w, present, order = index.weight_vector(tag_weights)
+    rows, scores = _rank_rows(index, w, present, order, trl, top_k, penalty_factor, subset)
+    if subset is not None:
+        rows = subset[rows]
+    integral = all(isinstance(v, int) for v in tag_weights.values())
+    return _explain(
+        index, trl_gate_score_adjustments(tag_weights, trl), rows,
+        [int(s) if integral else s for s in scores.tolist()],
+    )
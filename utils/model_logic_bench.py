@@ -0,0 +1,242 @@
+"""
+Benchmark of model_logic.score_models against the original full scan.
+
+    python -m utils.model_logic_bench
+
+Synthetic catalogues of growing size are built by resampling the tags of
+business_models.json. Each row checks that both implementations return
+identical results, then reports the mean time per call. The second table
+does the same for rank_for_trl against the original TRL gate / adjust /
+cap functions run per call (caps applied to the full candidate set in both), and the
+third for rank_models (answers -> ranked rows) against accumulate_tags
+plus that pipeline, on a synthetic question bank since QUESTION_BANK is
+empty in this tree.
+"""
+import random
+import time
+from collections import Counter
+
+from utils.model_logic import (
+    TRL_GATE_PENALISED, compiled_questions, load_models,
+    rank_for_trl, rank_models, score_models, tag_index, trl_tables,
+)
+
+
+def score_models_full_scan(tag_weights, models, top_k=3):
+    """The original implementation: score every model, sort everything."""
+    results = []
+    for m in models:
+        mtags = set(m.get("tags", []))
+        overlap = {t: w for t, w in tag_weights.items() if t in mtags and w > 0}
+        penalty_overlap = {t: w for t, w in tag_weights.items() if t in mtags and w < 0}
+        score = sum(overlap.values()) + sum(penalty_overlap.values())
+        results.append({
+            "model": m,
+            "score": score,
+            "matched": dict(sorted(overlap.items(), key=lambda x: -x[1])),
+            "penalties": dict(sorted(penalty_overlap.items(), key=lambda x: x[1]))
+        })
+    results.sort(key=lambda x: x["score"], reverse=True)
+    return results[:top_k]
+
+
+def trl_gate_original(models, trl_level):
+    """scoring.trl_gate as first written."""
+    return [m for m in models if m.get("trl_min",1) <= trl_level]
+
+
+def trl_gate_score_adjustments_original(tag_weights, trl_level):
+    """The original implementation, verbatim."""
+    if trl_level is None:
+        return tag_weights
+
+    adj = tag_weights.copy()
+
+    if trl_level <= 4:
+        for t in ["high_capex", "infrastructure", "BOOT"]:
+            if t in adj:
+                adj[t] -= 2
+        for t in ["IP", "services", "early_stage", "open_source"]:
+            adj[t] += 1
+
+    elif 5 <= trl_level <= 6:
+        for t in ["distribution", "servitization", "aftermarket", "scalable"]:
+            adj[t] += 1
+
+    else:  # 7–9
+        for t in ["infrastructure", "servitization", "managed", "growth", "transaction"]:
+            adj[t] += 1
+
+    return adj
+
+
+def apply_trl_caps_original(scored_models, trl, penalty_factor=0.7):
+    """The original implementation, verbatim."""
+    if trl is None:
+        return scored_models
+
+    for item in scored_models:
+        m = item["model"]
+        tags = set(m.get("tags", []))
+
+        if "high_capex" in tags and trl < 5:
+            item["score"] = int(item["score"] * penalty_factor)
+
+        if {"manufacturing", "infrastructure"} & tags and trl < 4:
+            item["score"] = int(item["score"] * penalty_factor)
+
+        if {"finance", "hybrid", "impact_finance"} & tags and trl < 6:
+            item["score"] = int(item["score"] * penalty_factor)
+
+    return scored_models
+
+
+def rank_for_trl_per_call(tag_weights, trl, models, top_k=3, penalty_factor=0.7):
+    """
+    The original chain trl_gate -> trl_gate_score_adjustments -> score_models
+    -> apply_trl_caps, run per call on the original functions, with the one
+    intended change: the caps apply to every eligible model before the top-k
+    cut (ties in catalogue order) instead of to the first top_k only.
+    """
+    eligible = trl_gate_original(models, trl)
+    adj = trl_gate_score_adjustments_original(tag_weights, trl)
+    scored = apply_trl_caps_original(score_models_full_scan(adj, eligible, top_k=len(eligible)), trl, penalty_factor)
+    position = {id(m): i for i, m in enumerate(models)}
+    scored.sort(key=lambda x: (-x["score"], position[id(x["model"])]))
+    return scored[:top_k]
+
+
+def accumulate_tags_per_call(selections, bank):
+    """The original implementation: rebuild the id index, merge Counters."""
+    tally = Counter()
+    by_id = {q["id"]: q for q in bank}
+    for qid, choice in selections.items():
+        q = by_id.get(qid)
+        if not q:
+            continue
+        tally.update(q["options"].get(choice, {}))
+    return tally
+
+
+def synthetic_question_bank(vocab, n=40, seed=0):
+    rng = random.Random(seed)
+    return [
+        {"id": f"Q{i}", "text": f"Question {i}",
+         "options": {f"opt{j}": {t: rng.choice([-2, -1, 1, 2, 3]) for t in rng.sample(vocab, rng.randint(1, 4))}
+                     for j in range(rng.randint(2, 5))}}
+        for i in range(n)
+    ]
+
+
+def synthetic_catalogue(n, seed=0):
+    """n models whose tag sets are drawn from the real catalogue's vocabulary."""
+    rng = random.Random(seed)
+    base = load_models()
+    vocab = sorted({t for m in base for t in m["tags"]})
+    # Regional variants add suffixed tags so the vocabulary grows with n
+    vocab += [f"{t}_r{r}" for r in range(n // 500) for t in vocab[:20]]
+    return [
+        {"id": f"BMX{i:05d}", "name": f"Model {i}",
+         "tags": rng.sample(vocab, rng.randint(2, 6)), "trl_min": rng.randint(1, 7)}
+        for i in range(n)
+    ]
+
+
+def random_profile(vocab, rng):
+    tags = rng.sample(vocab, 8)
+    return Counter({t: rng.choice([-2, -1, 1, 2, 3, 4]) for t in tags})
+
+
+def _time(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def run(sizes=(70, 500, 1000, 5000), profiles=50, top_k=3):
+    rng = random.Random(1)
+    rows = []
+    for n in sizes:
+        models = synthetic_catalogue(n)
+        vocab = sorted({t for m in models for t in m["tags"]})
+        profs = [random_profile(vocab, rng) for _ in range(profiles)]
+        index = tag_index(models)
+
+        for p in profs:
+            assert score_models(p, index, top_k) == score_models_full_scan(p, models, top_k)
+
+        full = _time(lambda: [score_models_full_scan(p, models, top_k) for p in profs], 3) / profiles
+        fast = _time(lambda: [score_models(p, index, top_k) for p in profs], 3) / profiles
+        rows.append({"models": n, "full_scan_ms": full * 1e3, "indexed_ms": fast * 1e3})
+    return rows
+
+
+def run_trl(sizes=(70, 1000, 5000), profiles=20, top_k=3):
+    rng = random.Random(2)
+    rows = []
+    for n in sizes:
+        models = synthetic_catalogue(n)
+        vocab = sorted({t for m in models for t in m["tags"]})
+        vocab += TRL_GATE_PENALISED
+        cases = [(random_profile(vocab, rng), rng.randint(0, 9)) for _ in range(profiles)]
+        index = tag_index(models)
+        trl_tables(index)
+
+        for p, trl in cases:
+            got = rank_for_trl(p, trl, index, top_k)
+            want = rank_for_trl_per_call(p, trl, models, top_k)
+            assert [(r["model"]["id"], r["score"]) for r in got] == [(r["model"]["id"], r["score"]) for r in want]
+
+        per_call = _time(lambda: [rank_for_trl_per_call(p, t, models, top_k) for p, t in cases], 1) / profiles
+        tables = _time(lambda: [rank_for_trl(p, t, index, top_k) for p, t in cases], 3) / profiles
+        rows.append({"models": n, "per_call_ms": per_call * 1e3, "tables_ms": tables * 1e3})
+    return rows
+
+
+def run_pipeline(sizes=(70, 1000, 5000), cases=20, top_k=3):
+    rng = random.Random(3)
+    rows = []
+    for n in sizes:
+        models = synthetic_catalogue(n)
+        vocab = sorted({t for m in models for t in m["tags"]}) + TRL_GATE_PENALISED
+        bank = synthetic_question_bank(vocab)
+        compiled_questions(bank)
+        index = tag_index(models)
+        trl_tables(index)
+        answers = [
+            ({q["id"]: rng.choice(list(q["options"])) for q in rng.sample(bank, 10)}, rng.randint(0, 9))
+            for _ in range(cases)
+        ]
+
+        def chain(sel, trl):
+            return rank_for_trl_per_call(accumulate_tags_per_call(sel, bank), trl, models, top_k)
+
+        for sel, trl in answers:
+            assert compiled_questions(bank).tally(sel) == accumulate_tags_per_call(sel, bank)
+            got, scores = rank_models(sel, trl, index, top_k, bank=bank)
+            want = chain(sel, trl)
+            assert [(models[r]["id"], s) for r, s in zip(got, scores.tolist())] == \
+                [(w["model"]["id"], w["score"]) for w in want]
+
+        per_call = _time(lambda: [chain(sel, trl) for sel, trl in answers], 1) / cases
+        compiled = _time(lambda: [rank_models(sel, trl, index, top_k, bank=bank) for sel, trl in answers], 3) / cases
+        rows.append({"models": n, "chain_ms": per_call * 1e3, "compiled_ms": compiled * 1e3})
+    return rows
+
+
+if __name__ == "__main__":
+    print(f"{'models':>7} {'full scan':>12} {'compiled':>12} {'speedup':>8}")
+    for row in run():
+        print(f"{row['models']:>7} {row['full_scan_ms']:>10.3f}ms {row['indexed_ms']:>10.3f}ms "
+              f"{row['full_scan_ms'] / row['indexed_ms']:>7.1f}x")
+
+    print(f"\n{'models':>7} {'TRL per call':>12} {'TRL tables':>12} {'speedup':>8}")
+    for row in run_trl():
+        print(f"{row['models']:>7} {row['per_call_ms']:>10.3f}ms {row['tables_ms']:>10.3f}ms "
+              f"{row['per_call_ms'] / row['tables_ms']:>7.1f}x")
+
+    print(f"\n{'models':>7} {'Counter chain':>13} {'compiled':>12} {'speedup':>8}")
+    for row in run_pipeline():
+        print(f"{row['models']:>7} {row['chain_ms']:>11.3f}ms {row['compiled_ms']:>10.3f}ms "
+              f"{row['chain_ms'] / row['compiled_ms']:>7.1f}x")
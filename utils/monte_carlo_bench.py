@@ -0,0 +1,188 @@
+"""
+Benchmark of utils.monte_carlo.success_prob against the original loop.
+
+    python -m utils.monte_carlo_bench
+
+Uses the page's default baseline (1000 units growing 10%, R5000 price,
+R3000 COGS, R200k OPEX, R1m CAPEX, 10 years at 10%). Each row checks that
+both give the same percentage for the same seed, then times one call. The
+loop is only timed up to 100k samples and extrapolated beyond that.
+The second table streams full NPV / IRR / payback / PI distributions and
+reports peak traced memory, which should not grow with the sample count.
+The third runs simulate_parallel from 1 worker to every core, checking
+each result is bit-identical to a rerun and to the same shares run serially.
+The last compares the standard errors of plain, antithetic and scrambled
+Halton sampling, and of the Optimistic - Baseline difference under common
+random numbers versus independent draws. The adaptive table shows how
+many samples estimate_adaptive needs for a +/-0.5 point 95% interval on
+a clear-cut, a borderline and a clearly failing project.
+"""
+import os
+import time
+import tracemalloc
+
+import numpy as np
+
+from utils.monte_carlo import (
+    SAMPLING_METHODS, _simulate_share, estimate, estimate_adaptive, estimate_scenarios, merge_aggregates,
+    simulate_distributions, simulate_parallel, split_samples, success_prob,
+)
+
+
+def baseline_inputs(years=10, units_y1=1000, growth=0.10, price=5000, cogs=3000,
+                    opex=200_000, capex=1_000_000):
+    units = np.array([int(round(units_y1 * (1 + growth) ** i)) for i in range(years)])
+    rev = units * price
+    cost = units * cogs + opex + np.r_[capex, np.zeros(years - 1)]
+    return rev.astype(float), cost.astype(float)
+
+
+def success_prob_loop(rev, cost, discount, n, seed=None):
+    """The page's original implementation: one sample and one list-built NPV per iteration."""
+    def npv(rate, flows):
+        return np.sum([cf / (1 + rate)**t for t, cf in enumerate(flows, start=1)])
+
+    rng = np.random.default_rng(seed)
+    success = 0
+    for _ in range(n):
+        rev_mult = rng.uniform(0.8, 1.2)
+        cost_mult = rng.uniform(0.85, 1.15)
+        rate_mult = rng.uniform(0.9, 1.1)
+        sim_flows = (rev * rev_mult - cost * cost_mult)
+        if npv(discount * rate_mult, sim_flows) > 0:
+            success += 1
+    return success / n * 100
+
+
+def _time(fn):
+    start = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - start
+
+
+def run(sizes=(5_000, 100_000, 1_000_000), discount=0.10, loop_limit=100_000, seed=7):
+    rev, cost = baseline_inputs()
+    # A margin that leaves the outcome uncertain, so the percentage is informative
+    cost = cost * 1.45
+    success_prob(rev, cost, discount, 1000, seed)  # warm-up
+    rows = []
+    for n in sizes:
+        fast, t_fast = _time(lambda: success_prob(rev, cost, discount, n, seed))
+        if n <= loop_limit:
+            slow, t_loop = _time(lambda: success_prob_loop(rev, cost, discount, n, seed))
+            assert abs(slow - fast) < 1e-9, (slow, fast)
+            measured = True
+        else:
+            _, t_ref = _time(lambda: success_prob_loop(rev, cost, discount, loop_limit, seed))
+            t_loop = t_ref * n / loop_limit
+            measured = False
+        rows.append({"samples": n, "prob": fast, "loop_s": t_loop, "vector_s": t_fast, "measured": measured})
+    return rows
+
+
+def run_memory(sizes=(100_000, 1_000_000, 5_000_000), discount=0.10, seed=7):
+    rev, cost = baseline_inputs()
+    cost = cost * 1.45
+    capex = np.r_[1_000_000.0, np.zeros(len(rev) - 1)]
+    rows = []
+    for n in sizes:
+        tracemalloc.start()
+        aggs, elapsed = _time(lambda: simulate_distributions(rev, cost, capex, discount, n, seed))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        s = aggs["npv"].summary()
+        rows.append({"samples": n, "seconds": elapsed, "peak_mb": peak / 2**20,
+                     "npv_p5": s["p5"], "npv_p50": s["p50"], "npv_p95": s["p95"]})
+    return rows
+
+
+def _fingerprint(aggs):
+    return {name: (a.moments.count, a.moments.mean, a.moments.m2, a.sketch.pos.tobytes(), a.missing)
+            for name, a in aggs.items()}
+
+
+def run_scaling(n=2_000_000, discount=0.10, seed=7, max_workers=None):
+    rev, cost = baseline_inputs()
+    cost = cost * 1.45
+    capex = np.r_[1_000_000.0, np.zeros(len(rev) - 1)]
+    rows = []
+    for workers in range(1, (max_workers or os.cpu_count() or 1) + 1):
+        aggs, elapsed = _time(lambda: simulate_parallel(rev, cost, capex, discount, n, seed, workers))
+        again = simulate_parallel(rev, cost, capex, discount, n, seed, workers)
+        children = np.random.SeedSequence(seed).spawn(workers)
+        serial = merge_aggregates(
+            _simulate_share((rev, cost, capex, discount, share, child, 65_536))
+            for share, child in zip(split_samples(n, workers), children)
+        )
+        assert _fingerprint(aggs) == _fingerprint(again) == _fingerprint(serial)
+        rows.append({"workers": workers, "seconds": elapsed, "npv_mean": aggs["npv"].moments.mean})
+    return rows
+
+
+def run_variance(n=5_000, discount=0.10, seed=7):
+    rev, cost = baseline_inputs()
+    cost = cost * 1.45
+    scenarios = {"baseline": (rev, cost), "optimistic": (rev * 1.03, cost * 0.98)}
+    rows = []
+    for method in SAMPLING_METHODS:
+        r = estimate_scenarios(scenarios, discount, n, seed, method)
+        # Same difference from two unrelated streams, as the tabs used to draw
+        base = estimate(rev, cost, discount, n, seed, method)
+        opt = estimate(rev * 1.03, cost * 0.98, discount, n, seed + 1, method)
+        independent_se = (base["success_se"] ** 2 + opt["success_se"] ** 2) ** 0.5
+        rows.append({
+            "method": method,
+            "prob": r["baseline"]["success_prob"],
+            "prob_se": r["baseline"]["success_se"],
+            "npv_se": r["baseline"]["npv_se"],
+            "diff_se_crn": r["differences"]["optimistic"]["success_se"],
+            "diff_se_independent": independent_se,
+        })
+    mc = rows[0]
+    for row in rows:
+        # Samples plain MC would need for the same success-probability SE
+        row["mc_equivalent"] = n * (mc["prob_se"] / row["prob_se"]) ** 2 if row["prob_se"] else float("inf")
+    return rows
+
+
+def run_adaptive(tolerance=0.5, discount=0.10, seed=7):
+    rev, cost = baseline_inputs()
+    rows = []
+    for label, cost_factor in [("clear-cut", 1.0), ("borderline", 1.45), ("failing", 1.9)]:
+        for method in SAMPLING_METHODS:
+            r = estimate_adaptive(rev, cost * cost_factor, discount, tolerance, seed=seed, method=method)
+            rows.append({"case": label, "method": method, "samples": r["samples"], "prob": r["success_prob"],
+                         "interval": r["interval"], "stopped": r["stopped"], "seconds": r["seconds"]})
+    return rows
+
+
+if __name__ == "__main__":
+    print(f"{'samples':>9} {'success %':>10} {'loop':>10} {'vectorised':>11} {'speedup':>8}")
+    for row in run():
+        mark = "" if row["measured"] else "*"
+        print(f"{row['samples']:>9} {row['prob']:>10.2f} {row['loop_s']:>9.3f}s{mark} "
+              f"{row['vector_s']:>10.4f}s {row['loop_s'] / row['vector_s']:>7.0f}x")
+    print("* extrapolated from the 100k loop timing")
+
+    print(f"\n{'samples':>9} {'seconds':>8} {'peak MB':>8} {'NPV P5':>14} {'P50':>14} {'P95':>14}")
+    for row in run_memory():
+        print(f"{row['samples']:>9} {row['seconds']:>8.2f} {row['peak_mb']:>8.1f} "
+              f"{row['npv_p5']:>14,.0f} {row['npv_p50']:>14,.0f} {row['npv_p95']:>14,.0f}")
+
+    rows = run_scaling()
+    print(f"\n{'workers':>8} {'seconds':>8} {'speedup':>8} {'NPV mean':>14}   (2M samples, {os.cpu_count()} cores)")
+    for row in rows:
+        print(f"{row['workers']:>8} {row['seconds']:>8.2f} {rows[0]['seconds'] / row['seconds']:>7.2f}x "
+              f"{row['npv_mean']:>14,.0f}")
+
+    print(f"\n{'method':>11} {'success %':>10} {'SE':>6} {'MC-equiv n':>11} {'NPV SE':>10} "
+          f"{'diff SE (CRN)':>14} {'(independent)':>14}   (5000 samples)")
+    for row in run_variance():
+        print(f"{row['method']:>11} {row['prob']:>10.2f} {row['prob_se']:>6.3f} {row['mc_equivalent']:>11,.0f} "
+              f"{row['npv_se']:>10,.0f} {row['diff_se_crn']:>14.3f} {row['diff_se_independent']:>14.3f}")
+
+    print(f"\n{'case':>10} {'method':>11} {'samples':>8} {'success %':>10} {'95% interval':>17} {'stopped':>10} {'seconds':>8}")
+    for row in run_adaptive():
+        lo, hi = row["interval"]
+        print(f"{row['case']:>10} {row['method']:>11} {row['samples']:>8} {row['prob']:>10.2f} "
+              f"{f'{lo:.2f} - {hi:.2f}':>17} {row['stopped']:>10} {row['seconds']:>8.3f}")
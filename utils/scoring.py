@@ -1,31 +1,40 @@
 
-import json, os
+import os
+from typing import Any, Mapping, Sequence
+
+import numpy as np
+from utils.data_loader import _with_tag_ids
+from utils.data_registry import get_asset
+from utils.model_logic import tag_overlap, trl_row, trl_tables
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
 
-def load_models():
-    with open(os.path.join(DATA_DIR,"business_models.json"),"r",encoding="utf-8") as f:
-        return json.load(f)
+def load_models() -> Sequence[Mapping[str, Any]]:
+    """Cached, read-only catalogue (tuple of mapping proxies); data_registry.thaw() gives a mutable copy."""
+    return get_asset(os.path.join(DATA_DIR,"business_models.json"), _with_tag_ids)
 
 def trl_gate(models, trl_level:int):
-    return [m for m in models if m.get("trl_min",1) <= trl_level]
+    # Precomputed mask only for the cached catalogue; other lists are one pass anyway
+    level = trl_row(trl_level)
+    if level is None or models is not load_models():
+        return [m for m in models if m.get("trl_min",1) <= trl_level]
+    eligible = trl_tables(models).eligible[level]
+    return [m for m, ok in zip(models, eligible) if ok]
+
+# (profile test, tags any of which earn the points, points)
+PROFILE_RULES = [
+    (lambda p: p.get("wants_recurring"), ("recurring", "software"), 20),
+    (lambda p: p.get("customer_type") == "enterprise", ("enterprise", "B2B"), 15),
+    (lambda p: p.get("customer_type") == "SME", ("SME", "B2B"), 10),
+    (lambda p: p.get("capex") == "low", ("low_capex", "software"), 15),
+    (lambda p: p.get("capex") == "high", ("infrastructure", "IoT"), 10),
+    (lambda p: p.get("partner_ready"), ("distribution", "B2B"), 8),
+]
 
 def score_models(profile:dict, models:list):
-    results = []
-    for m in models:
-        score = 0
-        tags = set(m.get("tags",[]))
-        if profile.get("wants_recurring") and ("recurring" in tags or "software" in tags):
-            score += 20
-        if profile.get("customer_type") == "enterprise" and ("enterprise" in tags or "B2B" in tags):
-            score += 15
-        if profile.get("customer_type") == "SME" and ("SME" in tags or "B2B" in tags):
-            score += 10
-        if profile.get("capex") == "low" and ("low_capex" in tags or "software" in tags):
-            score += 15
-        if profile.get("capex") == "high" and ("infrastructure" in tags or "IoT" in tags):
-            score += 10
-        if profile.get("partner_ready") and ("distribution" in tags or "B2B" in tags):
-            score += 8
-        results.append({"model": m, "score": score})
+    # One pass over the catalogue's tag postings for the rules the profile triggers
+    rules = [(tags, points) for applies, tags, points in PROFILE_RULES if applies(profile)]
+    hits = tag_overlap(models, *(tags for tags, _ in rules)) > 0
+    scores = np.array([points for _, points in rules], dtype=np.int64) @ hits
+    results = [{"model": m, "score": int(s)} for m, s in zip(models, scores)]
     results.sort(key=lambda x: x["score"], reverse=True)
     return results[:3]
@@ -0,0 +1,204 @@
+"""
+Interned tag vocabulary shared by every data asset and scoring module.
+
+    python -m utils.tag_registry
+
+The build collects every tag from the JSON assets and the tag sets hard-coded
+in utils/model_logic.py, appends new ones to data/tag_registry.json (existing
+ids never change) and reports tags that look unknown or misspelled.
+At runtime loaders call tag_ids(tags) to get compact int16 arrays. The loaded
+registry is read-only: a tag missing from it maps to UNKNOWN_TAG, and lint_tags
+lists such tags until the registry is rebuilt.
+"""
+import difflib
+import json
+import re
+from collections import defaultdict
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+REGISTRY_PATH = BASE_DIR / "data" / "tag_registry.json"
+TAG_DTYPE = np.int16
+# Id of any tag missing from the registry; never equal to a registered id
+UNKNOWN_TAG = -1
+
+
+# ============================================================
+# ---------- BUILD ----------
+# ============================================================
+
+def _load(rel):
+    with open(BASE_DIR / rel, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def collect_tags():
+    """{tag: set of sources that mention it} across data assets and hard-coded sets."""
+    from utils import model_logic
+
+    seen = defaultdict(set)
+
+    for m in _load("data/business_models.json"):
+        for t in m.get("tags", []):
+            seen[t].add("business_models")
+
+    for tags in _load("data/archetype_tags.json").values():
+        for t in tags:
+            seen[t].add("archetype_tags")
+
+    for a in _load("data/archetypes.json"):
+        for t in a.get("core_tags", []):
+            seen[t].add("archetypes")
+
+    for answers in _load("data/bm_rule_weights.json").values():
+        for detail in answers.values():
+            for t in detail.get("tags", {}):
+                seen[t].add("bm_rule_weights")
+
+    hard_coded = {
+        "auto_cluster": [t for tags, _ in model_logic.CLUSTER_RULES for t in tags],
+        "trl_gate": model_logic.TRL_GATE_PENALISED
+        + [t for tags in model_logic.TRL_GATE_BOOSTED.values() for t in tags],
+        "apply_trl_caps": [t for tags, _ in model_logic.TRL_CAP_RULES for t in tags],
+    }
+    for source, tags in hard_coded.items():
+        for t in tags:
+            seen[t].add(source)
+
+    return seen
+
+
+def _fold(tag):
+    return re.sub(r"[^a-z0-9]", "", tag.lower())
+
+
+def lint_tags(seen, registry=None):
+    """
+    unknown:      tags referenced somewhere but carried by no business model
+                  and defined by no rule answer (they can never match).
+    unregistered: tags missing from the registry (default: the loaded one);
+                  they get UNKNOWN_TAG until build_registry is run.
+    variants:     groups differing only in case / punctuation (e.g. b2b vs B2B).
+    near_miss:    {tag: closest catalogue tags}, likely typos of a model tag.
+    """
+    registry = load_registry() if registry is None else registry
+    unregistered = sorted(t for t in seen if t not in registry)
+    catalogue = sorted(t for t, src in seen.items() if "business_models" in src)
+    defined = {t for t, src in seen.items() if src & {"business_models", "bm_rule_weights"}}
+    unknown = sorted(t for t in seen if t not in defined)
+
+    groups = defaultdict(list)
+    for t in seen:
+        groups[_fold(t)].append(t)
+    variants = sorted(sorted(g) for g in groups.values() if len(g) > 1)
+
+    near_miss = {}
+    for t in unknown:
+        close = [c for c in difflib.get_close_matches(t, catalogue, n=3, cutoff=0.8) if c != t]
+        if close:
+            near_miss[t] = close
+
+    return {"unknown": unknown, "unregistered": unregistered, "variants": variants, "near_miss": near_miss}
+
+
+def build_registry(path=REGISTRY_PATH):
+    """
+    Append newly seen tags (sorted) after the existing ones; ids are never
+    reused. A running process keeps the registry it loaded, so ids already
+    compiled into its indexes stay valid; new tags are picked up on restart.
+    """
+    existing = []
+    if Path(path).exists():
+        with open(path, "r", encoding="utf-8") as f:
+            existing = json.load(f)["tags"]
+
+    seen = collect_tags()
+    known = set(existing)
+    tags = existing + sorted(t for t in seen if t not in known)
+    if len(tags) > np.iinfo(TAG_DTYPE).max:
+        raise ValueError(f"{len(tags)} tags no longer fit in {np.dtype(TAG_DTYPE).name}")
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "tags": tags}, f, indent=1)
+        f.write("\n")
+
+    return tags, lint_tags(seen, {t: i for i, t in enumerate(tags)})
+
+
+# ============================================================
+# ---------- RUNTIME ----------
+# ============================================================
+
+@lru_cache(maxsize=None)
+def load_registry(path=REGISTRY_PATH):
+    """Read-only {tag: id}, loaded once per process."""
+    if not Path(path).exists():
+        return MappingProxyType({})
+    with open(path, "r", encoding="utf-8") as f:
+        return MappingProxyType({t: i for i, t in enumerate(json.load(f)["tags"])})
+
+
+def tag_id(tag):
+    return load_registry().get(tag, UNKNOWN_TAG)
+
+
+def tag_ids(tags):
+    """
+    Sorted, de-duplicated int16 id array for a tag list. Unregistered tags
+    collapse into one leading UNKNOWN_TAG entry.
+    """
+    return np.unique(np.fromiter((tag_id(t) for t in tags), dtype=TAG_DTYPE))
+
+
+def registered_ids(item, ids_key="tag_ids"):
+    """item's id array, or None when it has none or it holds UNKNOWN_TAG (compare by name)."""
+    ids = item.get(ids_key)
+    if ids is None or (len(ids) and ids[0] == UNKNOWN_TAG):
+        return None
+    return ids
+
+
+def shared(a, b):
+    """Ids present in both sorted id arrays."""
+    return np.intersect1d(a, b, assume_unique=True)
+
+
+def overlap_counts(items, tags, ids_key="tag_ids", names_key="tags"):
+    """
+    Per item, how many distinct `tags` it carries. Items with a registered
+    id array are counted in one pass over their concatenated ids; the rest
+    are compared by name.
+    """
+    tags = set(tags)
+    counts = np.zeros(len(items), dtype=np.int64)
+    query = tag_ids(tags)
+    query = query[query != UNKNOWN_TAG]
+    arrays = [registered_ids(item, ids_key) for item in items]
+    rows = [r for r, ids in enumerate(arrays) if ids is not None]
+    if rows:
+        lengths = [len(arrays[r]) for r in rows]
+        flat = np.concatenate([arrays[r] for r in rows])
+        owner = np.repeat(np.arange(len(rows)), lengths)
+        counts[rows] = np.bincount(owner[np.isin(flat, query)], minlength=len(rows))
+    for r, ids in enumerate(arrays):
+        if ids is None:
+            counts[r] = len(set(items[r].get(names_key, [])) & tags)
+    return counts
+
+
+if __name__ == "__main__":
+    tags, report = build_registry()
+    print(f"{REGISTRY_PATH.relative_to(BASE_DIR)}: {len(tags)} tags")
+    if report["unknown"]:
+        print(f"\n{len(report['unknown'])} tags referenced but never defined by a model or rule:")
+        for t in report["unknown"]:
+            hint = f"  (did you mean {', '.join(report['near_miss'][t])}?)" if t in report["near_miss"] else ""
+            print(f"  {t}{hint}")
+    if report["variants"]:
+        print("\nCase / spelling variants of the same tag:")
+        for group in report["variants"]:
+            print("  " + " / ".join(group))